@@ -0,0 +1,15 @@
+"""Extract, mask and unmask secrets in .env files."""
+
+from env_wrangler.application.content import extract_secrets_from_content
+from env_wrangler.application.content import mask_content
+from env_wrangler.application.content import unmask_content
+from env_wrangler.domain.secrets import classify_secrets
+from env_wrangler.infrastructure.content import parse_env
+
+__all__ = [
+    "classify_secrets",
+    "extract_secrets_from_content",
+    "mask_content",
+    "parse_env",
+    "unmask_content",
+]
@@ -0,0 +1,69 @@
+"""Application use-case for running an operation over many directories."""
+
+from collections.abc import Callable
+from collections.abc import Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from env_wrangler.infrastructure.journal import Journal
+from env_wrangler.infrastructure.journal import journal_path
+
+
+class PathNotProcessed(Exception):  # noqa: N818
+    """Raised by a bulk task when a directory is left untouched.
+
+    Unlike a failure this is not an error (e.g. there was nothing to do), but
+    the directory is not journaled as done, so `--resume` revisits it.
+    """
+
+
+@dataclass(frozen=True, slots=True)
+class BulkResult:
+    """Outcome of a bulk operation for one directory."""
+
+    path: Path
+    status: str
+    value: Any = None
+    error: Exception | None = None
+
+
+def run_bulk(
+    operation: str,
+    paths: list[Path],
+    task: Callable[[Path], Any],
+    resume: bool = False,
+) -> Iterator[BulkResult]:
+    """Run `task` for each directory, journaling completed ones.
+
+    With `resume`, directories completed by a previous interrupted or failed
+    run of the same operation over the same directories are skipped. A
+    failing directory is recorded and the run moves on; a task raising
+    `PathNotProcessed` is recorded as not processed. The journal is removed
+    once every directory has completed.
+    """
+    journal = Journal(journal_path(operation, paths), resume=resume)
+    incomplete = False
+    try:
+        for path in paths:
+            if journal.is_done(path):
+                yield BulkResult(path, "skipped")
+                continue
+            try:
+                value = task(path)
+            except PathNotProcessed as e:
+                incomplete = True
+                journal.record(path, "not-processed", str(e) or None)
+                yield BulkResult(path, "not-processed", error=e)
+                continue
+            except Exception as e:  # noqa: BLE001
+                incomplete = True
+                journal.record(path, "failed", f"{type(e).__name__}: {e}")
+                yield BulkResult(path, "failed", error=e)
+                continue
+            journal.record(path, "done")
+            yield BulkResult(path, "done", value)
+    except BaseException:
+        journal.close()
+        raise
+    journal.close(discard=not incomplete)
@@ -0,0 +1,58 @@
+"""Filesystem-free use-cases for env content held in memory."""
+
+from collections.abc import Iterable
+from collections.abc import Mapping
+
+from env_wrangler.domain.secrets import classify_secrets
+from env_wrangler.domain.secrets import remove_masked_values
+from env_wrangler.infrastructure.content import EnvContent
+from env_wrangler.infrastructure.content import mask_env
+from env_wrangler.infrastructure.content import parse_env
+from env_wrangler.infrastructure.content import unmask_env
+
+
+def _parse_all(contents: Iterable[EnvContent]) -> tuple[dict, dict]:
+    """Parse and merge contents, returning interpolated and raw values."""
+    env: dict = {}
+    raw_env: dict = {}
+    for content in contents:
+        if isinstance(content, Mapping):
+            env |= content
+            raw_env |= content
+            continue
+        data = content if isinstance(content, str | bytes) else list(content)
+        env |= parse_env(data)
+        raw_env |= parse_env(data, interpolate=False)
+    return env, raw_env
+
+
+def extract_secrets_from_content(
+    contents: Iterable[EnvContent | Mapping],
+    key_words: list[str],
+    ignore_keys: list[str] | None = None,
+) -> dict:
+    """Return the secrets found in one or more env contents or mappings.
+
+    Later contents override earlier ones, like `envs_to_dict`.
+    """
+    env, raw_env = _parse_all(contents)
+    return remove_masked_values(classify_secrets(env, raw_env, key_words, ignore_keys))
+
+
+def mask_content(
+    content: EnvContent | Mapping,
+    key_words: list[str],
+    ignore_keys: list[str] | None = None,
+) -> str | bytes | dict:
+    """Mask secrets (including derived ones) in env content or a mapping."""
+    data = content if isinstance(content, str | bytes | Mapping) else list(content)
+    env, raw_env = _parse_all([data])
+    secrets = classify_secrets(env, raw_env, key_words, ignore_keys)
+    return mask_env(data, key_words, ignore_keys, list(secrets))
+
+
+def unmask_content(
+    content: EnvContent | Mapping, secrets: Mapping
+) -> str | bytes | dict:
+    """Restore secret values into masked env content or a mapping."""
+    return unmask_env(content, secrets)
@@ -1,81 +1,320 @@
 """Application use-cases for env_wrangler."""
 
 import json
+import os
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from contextlib import ExitStack
 from pathlib import Path
 
+from env_wrangler.domain.drift import fingerprint_values
+from env_wrangler.domain.drift import iter_drift
+from env_wrangler.domain.matching import compile_secret_pattern
+from env_wrangler.domain.secrets import MASK
+from env_wrangler.domain.secrets import MIN_DERIVED_SECRET_LENGTH
+from env_wrangler.domain.secrets import classify_secrets
 from env_wrangler.domain.secrets import filter_keys_by_substring
 from env_wrangler.domain.secrets import remove_masked_values
+from env_wrangler.infrastructure.audit import log_audit_event
+from env_wrangler.infrastructure.compact_secrets import CompactSecrets
+from env_wrangler.infrastructure.compact_secrets import CompactSecretsError
+from env_wrangler.infrastructure.compact_secrets import write_compact_secrets
+from env_wrangler.infrastructure.config import config_resolver
+from env_wrangler.infrastructure.external_sort import iter_json_items
+from env_wrangler.infrastructure.external_sort import read_run
+from env_wrangler.infrastructure.external_sort import spill_run
 from env_wrangler.infrastructure.files import envs_to_dict
 from env_wrangler.infrastructure.files import mask_sensitive_data_in_file
 from env_wrangler.infrastructure.files import save_dict_to_env_file
 from env_wrangler.infrastructure.files import save_dict_to_json_file
 from env_wrangler.infrastructure.files import unmask_sensitive_data_in_file
+from env_wrangler.infrastructure.scan import iter_repo_files
+from env_wrangler.infrastructure.scan import scan_files
+from env_wrangler.infrastructure.snapshots import SNAPSHOT_RETENTION
+from env_wrangler.infrastructure.snapshots import collect_garbage
+from env_wrangler.infrastructure.snapshots import list_snapshots
+from env_wrangler.infrastructure.snapshots import prune_snapshots
+from env_wrangler.infrastructure.snapshots import restore_snapshot
+from env_wrangler.infrastructure.snapshots import select_snapshot
+from env_wrangler.infrastructure.snapshots import take_snapshot
+
+SECRETS_FILES = (".secrets", "secrets.json")
+COMPACT_SECRETS_FILE = ".secrets.bin"
+
+
+def _audit(event: str, path: Path, keys, files: list[Path]) -> None:
+    """Record which keys an operation touched (never their values)."""
+    log_audit_event(
+        event,
+        path=str(path),
+        keys=sorted(keys),
+        files=[str(file) for file in files],
+    )
+
+
+def _touched_keys(touched: dict[Path, list[str]]) -> set[str]:
+    return {key for keys in touched.values() for key in keys}
+
+
+def resolve_settings(path: Path, defaults: dict) -> dict:
+    """Return the settings for a directory, including project overrides."""
+    return config_resolver.resolve(path, defaults)
+
+
+def _stored_secrets(
+    path: Path, output_format: str | None
+) -> Iterable[tuple[str, str | None]]:
+    """Yield the secrets store this extract wrote, in key order."""
+    if output_format != "env":
+        return iter_json_items(path / "secrets.json")
+    return sorted(envs_to_dict([str(path / ".secrets")], interpolate=False).items())
+
+
+def _open_compact_store(path: Path) -> CompactSecrets | None:
+    """Open the compact store unless it is missing or older than a text store.
+
+    The checksum is verified on open; a corrupted store is ignored when a
+    text store can be used instead.
+    """
+    compact = path / COMPACT_SECRETS_FILE
+    if not compact.exists():
+        return None
+
+    text_stores = [path / name for name in SECRETS_FILES if (path / name).exists()]
+    mtime = compact.stat().st_mtime_ns
+    if any(file.stat().st_mtime_ns > mtime for file in text_stores):
+        return None
+    try:
+        return CompactSecrets(compact)
+    except CompactSecretsError:
+        if text_stores:
+            return None
+        raise
 
 
 def extract_secrets(
-    path: Path, key_words: list[str], target_envs: list[str], output_format: str | None
+    path: Path,
+    key_words: list[str],
+    target_envs: list[str],
+    output_format: str | None,
+    compact: bool = False,
 ) -> list[Path]:
-    """Extract secrets from env files and persist them in the requested format."""
+    """Extract secrets from env files and persist them in the requested format.
+
+    With `compact`, a memory-mappable copy of the saved secrets is also
+    written for `unmask_secrets` to read without parsing.
+    """
     env_files = [str(path / file) for file in target_envs]
     env = envs_to_dict(env_files)
 
-    secrets_dict = filter_keys_by_substring(env, key_words)
-    secrets_dict = remove_masked_values(secrets_dict)
+    raw_env = envs_to_dict(env_files, interpolate=False)
+    secrets_dict = remove_masked_values(classify_secrets(env, raw_env, key_words))
 
     if not secrets_dict:
         return []
 
-    if output_format == "json":
-        output_file = save_dict_to_json_file(secrets_dict, path / "secrets.json")
-        return [output_file] if output_file else []
+    output_files: list[Path | None] = []
+    if output_format != "env":
+        output_files.append(save_dict_to_json_file(secrets_dict, path / "secrets.json"))
+    if output_format != "json":
+        output_files.append(save_dict_to_env_file(secrets_dict, path / ".secrets"))
+    if compact:
+        output_files.append(
+            write_compact_secrets(
+                path / COMPACT_SECRETS_FILE, _stored_secrets(path, output_format)
+            )
+        )
 
-    if output_format == "env":
-        output_file = save_dict_to_env_file(secrets_dict, path / ".secrets")
-        return [output_file] if output_file else []
-
-    output_file1 = save_dict_to_json_file(secrets_dict, path / "secrets.json")
-    output_file2 = save_dict_to_env_file(secrets_dict, path / ".secrets")
-    return [file for file in (output_file1, output_file2) if file]
+    saved = [file for file in output_files if file]
+    _audit("extract", path, secrets_dict, saved)
+    return saved
 
 
 def mask_secrets(
     path: Path, key_words: list[str], ignore_keys: list[str], target_envs: list[str]
 ) -> list[Path]:
     """Mask sensitive values in configured env files."""
+    env_files = [str(path / file) for file in target_envs]
+    env = envs_to_dict(env_files)
+    raw_env = envs_to_dict(env_files, interpolate=False)
+    secret_keys = list(classify_secrets(env, raw_env, key_words, ignore_keys))
+
+    take_snapshot(path, [path / file for file in target_envs])
+
     masked_files: list[Path] = []
+    touched: dict[Path, list[str]] = {}
     for file_path in target_envs:
         file = path / file_path
         if file.exists():
             masked_files.append(file)
-            mask_sensitive_data_in_file(file, key_words, ignore_keys)
+            keys = mask_sensitive_data_in_file(
+                file, key_words, ignore_keys, secret_keys
+            )
+            if keys:
+                touched[file] = keys
 
+    _audit("mask", path, _touched_keys(touched), list(touched))
     return masked_files
 
 
 def unmask_secrets(
     path: Path, key_words: list[str], target_envs: list[str]
 ) -> list[Path]:
-    """Unmask sensitive values in configured env files."""
+    """Unmask sensitive values in configured env files.
+
+    A current compact store written by `extract` is memory-mapped and used
+    as is: its keys are exact, so each env key costs one binary search and
+    only the keys found in the env files are decoded.
+    """
     secret_env = path / ".secrets"
     secret_json = path / "secrets.json"
 
-    filtered: dict[str, str]
-    if secret_env.exists():
-        env = envs_to_dict([str(secret_env)])
-        filtered = filter_keys_by_substring(env, key_words)
-    else:
-        filtered = json.loads(secret_json.read_text())
+    with ExitStack() as stack:
+        store = _open_compact_store(path)
+        filtered: Mapping[str, str | None]
+        if store is not None:
+            filtered = stack.enter_context(store)
+        elif secret_env.exists():
+            # Stored values are literal; derived ones may hold `${VAR}`
+            env = envs_to_dict([str(secret_env)], interpolate=False)
+            # Derived secrets don't match `key_words`; restore them when masked
+            targets = envs_to_dict([str(path / file) for file in target_envs])
+            masked_keys = {key for key, value in targets.items() if value == MASK}
+            filtered = filter_keys_by_substring(env, key_words) | {
+                key: value for key, value in env.items() if key in masked_keys
+            }
+        else:
+            filtered = json.loads(secret_json.read_text())
 
-    unmasked_files: list[Path] = []
-    for file_path in target_envs:
-        env_file = path / file_path
-        if env_file.exists():
-            unmasked_files.append(env_file)
-            unmask_sensitive_data_in_file(env_file, filtered)
+        take_snapshot(path, [path / file for file in target_envs])
+
+        unmasked_files: list[Path] = []
+        touched: dict[Path, list[str]] = {}
+        for file_path in target_envs:
+            env_file = path / file_path
+            if env_file.exists():
+                unmasked_files.append(env_file)
+                keys = unmask_sensitive_data_in_file(
+                    env_file, filtered, substring=store is None
+                )
+                if keys:
+                    touched[env_file] = keys
 
+    _audit("unmask", path, _touched_keys(touched), list(touched))
     return unmasked_files
 
 
+def list_env_snapshots(path: Path) -> list[dict]:
+    """Return the snapshots taken of a directory's env files, oldest first."""
+    return list_snapshots(path)
+
+
+def clean_snapshots(path: Path) -> tuple[int, int]:
+    """Prune a directory's old snapshots and delete unreferenced blobs.
+
+    Returns the number of manifests and blobs removed.
+    """
+    return prune_snapshots(path), collect_garbage()
+
+
+def restore_env_files(path: Path, snapshot_id: str | None = None) -> list[Path]:
+    """Roll a directory's env files back to a snapshot.
+
+    Defaults to the latest snapshot that differs from the current files.
+
+    The current files are snapshotted first so the restore can be undone.
+    """
+    snapshot = select_snapshot(path, snapshot_id)
+    # Keep one extra so the snapshot being restored is never pruned here
+    take_snapshot(
+        path, [path / name for name in snapshot["files"]], keep=SNAPSHOT_RETENTION + 1
+    )
+
+    restored = restore_snapshot(path, snapshot)
+    _audit("restore", path, [], restored)
+    return restored
+
+
+def scan_for_leaks(
+    path: Path, root: Path, target_envs: list[str], workers: int | None = None
+) -> list[tuple[Path, int, list[str]]]:
+    """Find extracted secret values that appear in other files under `root`.
+
+    Returns `(file, line, keys)` for every hit. The secrets files and the
+    configured env files in `path` are expected to hold the values and are
+    not reported.
+    """
+    secrets: dict[str, str] = {}
+    for secrets_file in reversed(SECRETS_FILES):
+        file = path / secrets_file
+        if file.exists():
+            secrets |= (
+                envs_to_dict([str(file)])
+                if secrets_file == ".secrets"
+                else json.loads(file.read_text())
+            )
+    secrets = remove_masked_values(secrets)
+
+    keys_by_value: dict[bytes, list[str]] = {}
+    for key, value in sorted(secrets.items()):
+        if value:
+            keys_by_value.setdefault(value.encode(), []).append(key)
+
+    pattern = compile_secret_pattern(
+        secrets.values(), min_length=MIN_DERIVED_SECRET_LENGTH, as_bytes=True
+    )
+    if not pattern:
+        return []
+
+    path = path.expanduser().resolve()
+    excluded = {path / name for name in (*SECRETS_FILES, *target_envs)}
+    files = (file for file in iter_repo_files(root) if file.resolve() not in excluded)
+    leaks = [
+        (file, line, keys_by_value[match])
+        for file, line, match in scan_files(files, pattern, workers)
+    ]
+    _audit(
+        "scan-leaks",
+        root,
+        {key for *_, keys in leaks for key in keys},
+        sorted({file for file, *_ in leaks}),
+    )
+    return leaks
+
+
+def secret_drift(paths: list[Path], defaults: dict) -> Iterator[dict]:
+    """Compare the secrets of several env directories, key by key.
+
+    Values are replaced by digests keyed with a random per-run key as soon as
+    each directory is read, so no plaintext is retained. Each directory's
+    sorted digests are spilled to a run file and the files are merged from
+    disk, so memory is bounded by the largest directory rather than growing
+    with the number of directories. Rows are yielded in key order.
+    """
+    run_key = os.urandom(32)
+    with tempfile.TemporaryDirectory(prefix="env-wrangler-drift-") as directory:
+        run_files = []
+        for path in paths:
+            settings = resolve_settings(path, defaults)
+            env = envs_to_dict([str(path / file) for file in settings["envs"]])
+            found = {
+                key: value
+                for key, value in filter_keys_by_substring(
+                    env, settings["key_words"]
+                ).items()
+                if key not in settings["ignore_keys"]
+            }
+            run_files.append(spill_run(fingerprint_values(found, run_key), directory))
+
+        yield from iter_drift(
+            [str(path) for path in paths], [read_run(file) for file in run_files]
+        )
+
+
 def has_secrets_file(path: Path) -> bool:
-    """Return True when either supported secrets file exists."""
-    return (path / ".secrets").exists() or (path / "secrets.json").exists()
+    """Return True when any supported secrets file exists."""
+    return any(
+        (path / name).exists() for name in (*SECRETS_FILES, COMPACT_SECRETS_FILE)
+    )
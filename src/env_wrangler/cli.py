@@ -1,11 +1,21 @@
+import json
 import logging
+import sys
 from pathlib import Path
 
 import click
 
+from .application.bulk import PathNotProcessed
+from .application.bulk import run_bulk
+from .application.secrets import clean_snapshots
 from .application.secrets import extract_secrets
 from .application.secrets import has_secrets_file
+from .application.secrets import list_env_snapshots
 from .application.secrets import mask_secrets
+from .application.secrets import resolve_settings
+from .application.secrets import restore_env_files
+from .application.secrets import scan_for_leaks
+from .application.secrets import secret_drift
 from .application.secrets import unmask_secrets
 from .infrastructure.config import config
 from .infrastructure.paths import home_agnostic_path
@@ -32,43 +42,91 @@ def common_options(func):
     )(func)
 
 
-@click.command()
-@common_options
-@click.option(
-    "--format",
-    type=click.Choice(["both", "json", "env"], case_sensitive=False),
-    help="The output format.",
-)
-def extract(path, format):  # noqa: A002
-    """Extract secrets from the .env file(s) in the given directory into a separate file."""
+def bulk_options(func):
+    """Decorator to add the options for commands that accept many directories."""
+    func = click.option(
+        "--resume",
+        is_flag=True,
+        help="Skip directories completed by a previous interrupted or failed run.",
+    )(func)
+    return click.option(
+        "-p",
+        "--path",
+        "paths",
+        required=True,
+        multiple=True,
+        type=click.Path(),
+        help="Directory containing .env files; repeat to process several.",
+    )(func)
 
-    path = Path(path).expanduser()
+
+def run_paths(operation: str, paths, resume: bool, func) -> None:
+    """Run a command for each directory, isolating failures per directory."""
+    failures = 0
+    paths = [Path(path).expanduser() for path in paths]
+    for result in run_bulk(operation, paths, func, resume):
+        if result.status == "skipped":
+            click.echo(f"Skipping {home_agnostic_path(result.path)} (already done)")
+        elif result.status == "failed":
+            failures += 1
+            click.secho(
+                f"Failed to {operation} {home_agnostic_path(result.path)}: "
+                f"{result.error}",
+                fg="red",
+                err=True,
+            )
+
+    if failures:
+        click.secho(
+            f"{failures} director(ies) failed; rerun with --resume to retry them.",
+            fg="red",
+            err=True,
+        )
+        sys.exit(1)
+
+
+def extract_path(path: Path, format: str | None, compact: bool) -> None:  # noqa: A002
     if path.is_file():
         file_error()
-        return
+        raise PathNotProcessed
 
     click.echo(f"Extracting secrets from all .env files in {home_agnostic_path(path)}")
 
-    key_words = config["default"]["key_words"]
-    target_envs = config["default"]["envs"]
-    output_files = extract_secrets(path, key_words, target_envs, format)
+    settings = resolve_settings(path, config["default"])
+    key_words = settings["key_words"]
+    target_envs = settings["envs"]
+    output_files = extract_secrets(path, key_words, target_envs, format, compact)
     if not output_files:
         click.secho("No secrets found to extract.", err=True, fg="yellow")
-        return
+        raise PathNotProcessed
 
     for output_file in output_files:
         click.echo(f"Secrets saved to {home_agnostic_path(output_file)}")
 
 
 @click.command()
-@common_options
-def mask(path) -> None:
-    """Mask sensitive data in the .env file(s) in the given directory."""
+@bulk_options
+@click.option(
+    "--format",
+    type=click.Choice(["both", "json", "env"], case_sensitive=False),
+    help="The output format.",
+)
+@click.option(
+    "--compact",
+    is_flag=True,
+    help="Also write a memory-mapped .secrets.bin that unmask reads without parsing.",
+)
+def extract(paths, format, resume, compact):  # noqa: A002
+    """Extract secrets from the .env file(s) in the given directory into a separate file."""
+    run_paths(
+        "extract", paths, resume, lambda path: extract_path(path, format, compact)
+    )
 
-    path = Path(path).expanduser()
+
+def mask_path(path: Path) -> None:
     if path.is_file():
         file_error()
-        return
+        raise PathNotProcessed
 
     if not has_secrets_file(path):
         click.secho(
@@ -80,13 +138,14 @@ def mask(path) -> None:
             fg="yellow",
             err=True,
         )
-        return
+        raise PathNotProcessed
 
+    settings = resolve_settings(path, config["default"])
     masked_files = mask_secrets(
         path,
-        config["default"]["key_words"],
-        config["default"]["ignore_keys"],
-        config["default"]["envs"],
+        settings["key_words"],
+        settings["ignore_keys"],
+        settings["envs"],
     )
 
     # Let the user know which files were masked
@@ -97,14 +156,16 @@ def mask(path) -> None:
 
 
 @click.command()
-@common_options
-def unmask(path) -> None:
-    """Unmask sensitive data in the .env file(s) in the given directory."""
+@bulk_options
+def mask(paths, resume) -> None:
+    """Mask sensitive data in the .env file(s) in the given directory."""
+    run_paths("mask", paths, resume, mask_path)
 
-    path = Path(path).expanduser()
+
+def unmask_path(path: Path) -> None:
     if path.is_file():
         file_error()
-        return
+        raise PathNotProcessed
 
     if not has_secrets_file(path):
         click.secho(
@@ -112,12 +173,13 @@ def unmask(path) -> None:
             fg="yellow",
             err=True,
         )
-        return
+        raise PathNotProcessed
 
+    settings = resolve_settings(path, config["default"])
     unmasked_files = unmask_secrets(
         path,
-        config["default"]["key_words"],
-        config["default"]["envs"],
+        settings["key_words"],
+        settings["envs"],
     )
 
     # Let the user know which files were unmasked
@@ -127,6 +189,169 @@ def unmask(path) -> None:
             click.echo(f"   {home_agnostic_path(file)}")
 
 
+@click.command()
+@bulk_options
+def unmask(paths, resume) -> None:
+    """Unmask sensitive data in the .env file(s) in the given directory."""
+    run_paths("unmask", paths, resume, unmask_path)
+
+
+@click.command()
+@common_options
+@click.option(
+    "--snapshot",
+    help="Snapshot id to restore (defaults to the latest that differs).",
+)
+@click.option("--list", "list_only", is_flag=True, help="List available snapshots.")
+@click.option(
+    "--gc",
+    is_flag=True,
+    help="Prune old snapshots and delete snapshot data no longer referenced.",
+)
+def restore(path, snapshot, list_only, gc) -> None:
+    """Restore the .env file(s) in the given directory from a snapshot."""
+
+    path = Path(path).expanduser()
+    if path.is_file():
+        file_error()
+        return
+
+    if gc:
+        manifests, blobs = clean_snapshots(path)
+        click.echo(f"Removed {manifests} snapshot(s) and {blobs} stored file(s).")
+        return
+
+    if list_only:
+        snapshots = list_env_snapshots(path)
+        if not snapshots:
+            click.secho("No snapshots found.", fg="yellow", err=True)
+        for item in snapshots:
+            click.echo(f"{item['id']}  {', '.join(sorted(item['files']))}")
+        return
+
+    try:
+        restored_files = restore_env_files(path, snapshot)
+    except FileNotFoundError as e:
+        click.secho(str(e), fg="yellow", err=True)
+        return
+
+    click.echo("Restored the following envs:")
+    for file in restored_files:
+        click.echo(f"   {home_agnostic_path(file)}")
+
+
+@click.command("scan-leaks")
+@common_options
+@click.option(
+    "-r",
+    "--root",
+    required=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Root of the repository to scan for leaked secret values.",
+)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    help="Number of worker processes (defaults to the CPU count).",
+)
+def scan_leaks(path, root, workers) -> None:
+    """Scan a repository for values from the secrets file(s) in the given directory."""
+
+    path = Path(path).expanduser()
+    if path.is_file():
+        file_error()
+        return
+
+    if not has_secrets_file(path):
+        click.secho(
+            "No secrets file(s) found (.secrets or secrets.json).",
+            fg="yellow",
+            err=True,
+        )
+        return
+
+    settings = resolve_settings(path, config["default"])
+    leaks = scan_for_leaks(path, Path(root).expanduser(), settings["envs"], workers)
+    if not leaks:
+        click.echo("No leaked secrets found.")
+        return
+
+    click.secho(f"Found {len(leaks)} leaked secret value(s):", fg="red", err=True)
+    for file, line, keys in leaks:
+        click.echo(f"   {home_agnostic_path(file)}:{line}: {', '.join(keys)}")
+    sys.exit(1)
+
+
+def drift_status(row: dict) -> str:
+    """Summarize a drift row for the table output."""
+    status = []
+    if row["missing"]:
+        status.append("missing")
+    if row["reused"]:
+        status.append("reused")
+    return ", ".join(status) or "ok"
+
+
+@click.command()
+@click.option(
+    "-p",
+    "--path",
+    "paths",
+    required=True,
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False),
+    help="Directory containing .env files; repeat for each environment.",
+)
+@click.option(
+    "--format",
+    type=click.Choice(["table", "json", "jsonl"], case_sensitive=False),
+    default="table",
+    show_default=True,
+    help="The output format; jsonl streams one row per key.",
+)
+def drift(paths, format) -> None:  # noqa: A002
+    """Compare secret keys and values across the given env directories."""
+
+    paths = [Path(path).expanduser() for path in paths]
+    defaults = config["default"]
+    rows = secret_drift(paths, defaults)
+
+    if format == "jsonl":
+        for row in rows:
+            click.echo(json.dumps(row, sort_keys=True))
+        return
+
+    rows = list(rows)
+    if format == "json":
+        click.echo(json.dumps(rows, indent=2, sort_keys=True))
+        return
+
+    if not rows:
+        click.secho("No secrets found to compare.", err=True, fg="yellow")
+        return
+
+    labels = [str(path) for path in paths]
+    headers = ["KEY", *(home_agnostic_path(label) for label in labels), "STATUS"]
+    table = [
+        [
+            row["key"],
+            *(row["values"][label] or "-" for label in labels),
+            drift_status(row),
+        ]
+        for row in rows
+    ]
+    widths = [
+        max(len(cell) for cell in column)
+        for column in zip(headers, *table, strict=True)
+    ]
+    for line in [headers, *table]:
+        click.echo(
+            "  ".join(
+                cell.ljust(width) for cell, width in zip(line, widths, strict=True)
+            )
+        )
+
+
 # Set up your command-line interface grouping
 @click.group()
 @click.version_option()
@@ -138,6 +363,9 @@ def cli():
 cli.add_command(extract)
 cli.add_command(mask)
 cli.add_command(unmask)
+cli.add_command(restore)
+cli.add_command(drift)
+cli.add_command(scan_leaks)
 
 if __name__ == "__main__":
     cli()
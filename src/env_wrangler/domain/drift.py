@@ -0,0 +1,83 @@
+"""Domain rules for comparing secrets across environments."""
+
+import hashlib
+import heapq
+import string
+from collections.abc import Iterable
+from collections.abc import Iterator
+from itertools import groupby
+
+from env_wrangler.domain.secrets import MASK
+
+MASKED = "masked"
+
+
+def fingerprint_values(env: dict, key: bytes) -> list[tuple[str, str | None]]:
+    """Replace values with keyed hex digests, sorted by key.
+
+    Digests are keyed (e.g. with a random per-run key) so equal values can be
+    compared without the output revealing anything about the plaintext.
+    Masked values map to None since they say nothing about the real value.
+    """
+    return sorted(
+        (
+            name,
+            None
+            if value is None or value == MASK
+            else hashlib.blake2b(value.encode(), key=key, digest_size=16).hexdigest(),
+        )
+        for name, value in env.items()
+    )
+
+
+def _group_label(index: int) -> str:
+    letters = string.ascii_uppercase
+    return letters[index] if index < len(letters) else str(index + 1)
+
+
+def _tag(
+    fingerprint: Iterable[tuple[str, str | None]], index: int
+) -> Iterator[tuple[str, int, str | None]]:
+    for name, digest in fingerprint:
+        yield name, index, digest
+
+
+def iter_drift(
+    labels: list[str], fingerprints: Iterable[Iterable[tuple[str, str | None]]]
+) -> Iterator[dict]:
+    """Yield one drift row per key across all environments, in key order.
+
+    Each fingerprint stream must be sorted by key. The streams are merged
+    lazily in a single pass, so only the current key's digests are held at a
+    time when the streams themselves are lazy (e.g. read from disk).
+    A row lists where the key is missing, a value group per environment
+    (environments with the same group letter share the value) and the groups
+    shared by more than one environment (a reuse risk).
+    """
+    streams = [
+        _tag(fingerprint, index) for index, fingerprint in enumerate(fingerprints)
+    ]
+    merged = heapq.merge(*streams, key=lambda item: (item[0], item[1]))
+    for name, items in groupby(merged, key=lambda item: item[0]):
+        digests = {index: digest for _, index, digest in items}
+
+        groups: dict[str, list[str]] = {}
+        values: dict[str, str | None] = {}
+        for index, label in enumerate(labels):
+            if index not in digests:
+                values[label] = None
+            elif digests[index] is None:
+                values[label] = MASKED
+            else:
+                group = groups.setdefault(digests[index], [])
+                group.append(label)
+                values[label] = _group_label(list(groups).index(digests[index]))
+
+        missing = [label for label, value in values.items() if value is None]
+        reused = [group for group in groups.values() if len(group) > 1]
+        yield {
+            "key": name,
+            "missing": missing,
+            "reused": reused,
+            "values": values,
+        }
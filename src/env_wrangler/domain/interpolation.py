@@ -0,0 +1,35 @@
+"""Domain rules for `${VAR}` interpolation between env values."""
+
+import re
+
+INTERPOLATION_RE = re.compile(r"\$\{(?P<name>[^}:]+)(?::-(?P<default>[^}]*))?\}")
+
+
+def interpolation_references(value: str | None) -> list[str]:
+    """Return the variable names referenced by `${VAR}` in a value."""
+    if not value:
+        return []
+    return [match.group("name") for match in INTERPOLATION_RE.finditer(value)]
+
+
+def keys_depending_on(raw_env: dict, targets: set[str]) -> set[str]:
+    """Return keys whose value interpolates any target key, directly or not.
+
+    Walks the interpolation graph once with memoization, so every key is
+    resolved at most one time no matter how many keys reference it. Cycles
+    are treated as not depending on anything further.
+    """
+    memo: dict[str, bool] = {}
+
+    def depends(key: str) -> bool:
+        if key in memo:
+            return memo[key]
+        memo[key] = False  # Guard against reference cycles
+        result = any(
+            ref in targets or depends(ref)
+            for ref in interpolation_references(raw_env.get(key))
+        )
+        memo[key] = result
+        return result
+
+    return {key for key in raw_env if key not in targets and depends(key)}
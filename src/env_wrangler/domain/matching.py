@@ -0,0 +1,54 @@
+"""Domain rules for finding known secret values inside arbitrary text."""
+
+import re
+from collections.abc import Iterable
+
+_END = ""
+
+
+def _trie_regex(node: dict) -> str:
+    """Render a character trie as a regex with shared prefixes factored out."""
+    literal = []
+    while _END not in node and len(node) == 1:
+        ((char, node),) = node.items()
+        literal.append(re.escape(char))
+
+    branches = [
+        re.escape(char) + _trie_regex(child)
+        for char, child in sorted(node.items())
+        if char != _END
+    ]
+    prefix = "".join(literal)
+    if not branches:
+        return prefix
+
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if _END in node:
+        return f"{prefix}(?:{body})?"
+    return prefix + body
+
+
+def compile_secret_pattern(
+    values: Iterable[str], min_length: int = 1, as_bytes: bool = False
+) -> re.Pattern | None:
+    """Compile secret values into a single trie-shaped regex.
+
+    The regex behaves like an Aho-Corasick automaton: values that share a
+    prefix share states, so one `search`/`finditer` sweep finds every value
+    without re-scanning the text once per secret. With `as_bytes` the
+    pattern matches the UTF-8 encoding of the values in bytes-like input.
+    Returns None when there is nothing to match.
+    """
+    trie: dict = {}
+    for value in values:
+        if not value or len(value) < min_length:
+            continue
+        node = trie
+        for char in value:
+            node = node.setdefault(char, {})
+        node[_END] = {}
+
+    if not trie:
+        return None
+    source = _trie_regex(trie)
+    return re.compile(source.encode() if as_bytes else source)
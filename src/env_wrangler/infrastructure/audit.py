@@ -0,0 +1,99 @@
+"""Infrastructure helpers for the structured audit log."""
+
+import atexit
+import json
+import logging
+import queue
+from datetime import UTC
+from datetime import datetime
+from logging.handlers import MemoryHandler
+from logging.handlers import QueueHandler
+from logging.handlers import QueueListener
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+from env_wrangler.infrastructure.config import LOG_FILE
+
+AUDIT_LOGGER_NAME = "env_wrangler.audit"
+MAX_LOG_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+BATCH_SIZE = 100
+
+_listener: QueueListener | None = None
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Format audit records as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "time": datetime.fromtimestamp(record.created, tz=UTC).isoformat(),
+            "event": record.getMessage(),
+            **getattr(record, "audit", {}),
+        }
+        return json.dumps(event, sort_keys=True)
+
+
+def start_audit_log(
+    log_file: Path | str | None = None,
+    max_bytes: int = MAX_LOG_BYTES,
+    backup_count: int = BACKUP_COUNT,
+    batch_size: int = BATCH_SIZE,
+) -> QueueListener:
+    """Route the audit logger through a queue to a batched, rotating file.
+
+    Callers only pay for a queue put; a background thread formats records,
+    buffers them in batches of `batch_size` and appends them to `log_file`,
+    rotating once it grows past `max_bytes`.
+    """
+    file_handler = RotatingFileHandler(
+        log_file or LOG_FILE,
+        maxBytes=max_bytes,
+        backupCount=backup_count,
+        encoding="utf-8",
+        delay=True,
+    )
+    file_handler.setFormatter(JsonLinesFormatter())
+    buffer = MemoryHandler(
+        batch_size,
+        flushLevel=logging.CRITICAL + 1,
+        target=file_handler,
+        flushOnClose=True,
+    )
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    logger = logging.getLogger(AUDIT_LOGGER_NAME)
+    logger.handlers = [QueueHandler(log_queue)]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    listener = QueueListener(log_queue, buffer)
+    listener.start()
+    return listener
+
+
+def stop_audit_log(listener: QueueListener) -> None:
+    """Drain the queue and flush any buffered records to disk."""
+    listener.stop()
+    for handler in listener.handlers:
+        target = getattr(handler, "target", None)
+        handler.close()
+        if target:
+            target.close()
+    logging.getLogger(AUDIT_LOGGER_NAME).handlers = []
+
+
+def _shutdown() -> None:
+    global _listener  # noqa: PLW0603
+    if _listener:
+        stop_audit_log(_listener)
+        _listener = None
+
+
+def log_audit_event(event: str, **fields) -> None:
+    """Record an audit event; starts the background writer on first use."""
+    global _listener  # noqa: PLW0603
+    if _listener is None:
+        _listener = start_audit_log()
+        atexit.register(_shutdown)
+    logging.getLogger(AUDIT_LOGGER_NAME).info(event, extra={"audit": fields})
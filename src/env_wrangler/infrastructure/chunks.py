@@ -0,0 +1,167 @@
+"""Infrastructure helpers for processing very large env files in parallel."""
+
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from dotenv import dotenv_values
+from dotenv.variables import parse_variables
+
+from env_wrangler.domain.secrets import MASK
+from env_wrangler.domain.secrets import should_mask
+from env_wrangler.infrastructure.env_index import index_env_range
+
+# Files at least this large are split into chunks and processed in a pool
+PARALLEL_THRESHOLD = 64 * 1024 * 1024
+CHUNK_SIZE = 8 * 1024 * 1024
+MASK_BYTES = MASK.encode()
+
+
+def chunk_ranges(data: bytes, chunk_size: int = CHUNK_SIZE) -> list[tuple[int, int]]:
+    """Split content into `[start, stop)` ranges that begin at line starts."""
+    ranges = []
+    start = 0
+    size = len(data)
+    while start < size:
+        newline = data.find(b"\n", min(start + chunk_size, size) - 1)
+        stop = size if newline == -1 else newline + 1
+        ranges.append((start, stop))
+        start = stop
+    return ranges
+
+
+def _process_range(data: bytes, start: int, stop: int, operation: str, args: tuple):
+    """Run one operation over the lines starting in `[start, stop)`."""
+    entries, end = index_env_range(data, start, stop)
+
+    if operation == "mask":
+        spans = [
+            (entry.start, entry.end, entry.key)
+            for entry in entries
+            if should_mask(entry.key, *args) and entry.value(data) != MASK_BYTES
+        ]
+        return end, spans
+
+    # "parse": raw (uninterpolated) values, parsed by dotenv like envs_to_dict
+    stream = io.StringIO(data[start:end].decode())
+    return end, list(dotenv_values(stream=stream, interpolate=False).items())
+
+
+def _process_chunk(task: tuple):
+    file, start, stop, operation, args = task
+    with (
+        Path(file).open("rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        return _process_range(data, start, stop, operation, args)
+
+
+def _map_chunks(
+    file: Path, operation: str, args: tuple, workers: int | None, chunk_size: int
+) -> list:
+    """Process a file chunk by chunk in a process pool and stitch the results.
+
+    Chunks are cut at line starts without knowing whether a multi-line quoted
+    value is open there. A chunk that finishes inside the next one (because a
+    quoted value crossed the boundary) invalidates that chunk's speculative
+    result, which is then recomputed in order from where the value ended.
+    """
+    if file.stat().st_size == 0:
+        return []
+
+    with (
+        file.open("rb") as f,
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+    ):
+        ranges = chunk_ranges(data, chunk_size)
+        tasks = [(str(file), start, stop, operation, args) for start, stop in ranges]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_process_chunk, tasks))
+
+        stitched = []
+        pos = 0
+        for (start, stop), speculative in zip(ranges, results, strict=True):
+            if pos >= stop:
+                continue
+            end, result = (
+                _process_range(data, pos, stop, operation, args)
+                if start < pos
+                else speculative
+            )
+            stitched.extend(result)
+            pos = end
+        return stitched
+
+
+def _resolve(values: list[tuple[str, str | None]]) -> dict:
+    """Interpolate `${VAR}` references exactly like `dotenv_values` does."""
+    resolved: dict[str, str | None] = {}
+    env = ChainMap(resolved, os.environ)
+    for name, value in values:
+        if value is None or "${" not in value:
+            resolved[name] = value
+        else:
+            resolved[name] = "".join(
+                atom.resolve(env) for atom in parse_variables(value)
+            )
+    return resolved
+
+
+def large_env_to_dict(
+    file: Path | str,
+    interpolate: bool = True,
+    *,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> dict:
+    """Parse a large env file in parallel chunks and return a dict."""
+    values = _map_chunks(Path(file), "parse", (), workers, chunk_size)
+    return _resolve(values) if interpolate else dict(values)
+
+
+def mask_large_env_file(  # noqa: PLR0913
+    file: Path | str,
+    filter_keys: list[str],
+    ignore_keys: list[str] | None = None,
+    extra_keys: list[str] | None = None,
+    *,
+    workers: int | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> list[str]:
+    """Mask a large env file, classifying chunks in parallel.
+
+    The masked file is streamed to a temporary file next to the original and
+    swapped in; nothing is written when no value changes. Returns the masked
+    keys.
+    """
+    file = Path(file)
+    args = (filter_keys, ignore_keys or [], extra_keys or [])
+    spans = _map_chunks(file, "mask", args, workers, chunk_size)
+    if not spans:
+        return []
+
+    fd, tmp = tempfile.mkstemp(dir=file.parent, prefix=f".{file.name}.")
+    try:
+        with (
+            file.open("rb") as f,
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+            memoryview(data) as view,
+            os.fdopen(fd, "wb") as out,
+        ):
+            pos = 0
+            for start, end, _ in spans:
+                out.write(view[pos:start])
+                out.write(MASK_BYTES)
+                pos = end
+            out.write(view[pos:])
+        shutil.copymode(file, tmp)
+        Path(tmp).replace(file)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return [key for *_, key in spans]
@@ -0,0 +1,192 @@
+"""Infrastructure helpers for a compact, memory-mappable secrets store.
+
+Layout (little-endian)::
+
+    header  magic, version, count, BLAKE2b digest of everything after it
+    table   `count` entries of (key offset, value offset, key length,
+            value length), sorted by UTF-8 key bytes
+    blob    key and value bytes, offsets relative to the start of the blob
+
+Lookups binary-search the table over a memory map, so opening the store
+only hashes it against its checksum and only the keys that are looked up
+are decoded.
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from collections.abc import Mapping
+from functools import cached_property
+from pathlib import Path
+from typing import Self
+
+MAGIC = b"EWSC"
+VERSION = 1
+_HEADER = struct.Struct("<4sHxxI16s")
+_ENTRY = struct.Struct("<QQII")
+# Value length marking a key without a value (None)
+_NO_VALUE = 0xFFFFFFFF
+
+
+class CompactSecretsError(ValueError):
+    """Raised when a compact secrets store is malformed or corrupted."""
+
+
+def write_compact_secrets(file: Path, items: Iterable[tuple[str, str | None]]) -> Path:
+    """Write `(key, value)` pairs, which must be sorted by key, to `file`.
+
+    The blob is streamed to a temporary file so only the fixed-size table is
+    held in memory; the result is checksummed and swapped in atomically.
+    Raises ValueError when keys are not strictly increasing, since lookups
+    binary-search the table.
+    """
+    table = bytearray()
+    count = 0
+    digest = hashlib.blake2b(digest_size=16)
+    previous: bytes | None = None
+    with tempfile.TemporaryFile() as blob:
+        offset = 0
+        for key, value in items:
+            key_bytes = key.encode()
+            if previous is not None and key_bytes <= previous:
+                msg = f"Keys must be unique and sorted: {key!r} follows {previous!r}"
+                raise ValueError(msg)
+            previous = key_bytes
+            value_bytes = b"" if value is None else str(value).encode()
+            table += _ENTRY.pack(
+                offset,
+                offset + len(key_bytes),
+                len(key_bytes),
+                _NO_VALUE if value is None else len(value_bytes),
+            )
+            blob.write(key_bytes + value_bytes)
+            offset += len(key_bytes) + len(value_bytes)
+            count += 1
+
+        digest.update(table)
+        blob.seek(0)
+        while chunk := blob.read(1024 * 1024):
+            digest.update(chunk)
+
+        fd, tmp = tempfile.mkstemp(dir=file.parent, prefix=f".{file.name}.")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(_HEADER.pack(MAGIC, VERSION, count, digest.digest()))
+                out.write(table)
+                blob.seek(0)
+                while chunk := blob.read(1024 * 1024):
+                    out.write(chunk)
+            Path(tmp).replace(file)
+        except BaseException:
+            Path(tmp).unlink(missing_ok=True)
+            raise
+    return file
+
+
+class CompactSecrets(Mapping):
+    """Read-only mapping over a memory-mapped compact secrets store.
+
+    The whole file is hashed against its checksum on open (one pass, far
+    cheaper than parsing); `verify=False` only checks the header. Damaged
+    entries found later raise CompactSecretsError too. Use as a context
+    manager so the map is closed when done.
+    """
+
+    def __init__(self, file: Path | str, verify: bool = True) -> None:
+        self.file = Path(file)
+        with self.file.open("rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                msg = f"{self.file} is not a compact secrets store"
+                raise CompactSecretsError(msg)
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self._count, checksum = _HEADER.unpack_from(self._data)
+        self._blob = _HEADER.size + self._count * _ENTRY.size
+        if magic != MAGIC or version != VERSION or self._blob > size:
+            self.close()
+            msg = f"{self.file} is not a compact secrets store"
+            raise CompactSecretsError(msg)
+        if verify and not self._checksum_matches(checksum):
+            self.close()
+            msg = f"{self.file} failed its checksum"
+            raise CompactSecretsError(msg)
+
+    def _checksum_matches(self, checksum: bytes) -> bool:
+        with memoryview(self._data) as view:
+            digest = hashlib.blake2b(view[_HEADER.size :], digest_size=16)
+        return digest.digest() == checksum
+
+    def _entry(self, index: int) -> tuple[int, int, int, int]:
+        return _ENTRY.unpack_from(self._data, _HEADER.size + index * _ENTRY.size)
+
+    def _slice(self, offset: int, length: int) -> bytes:
+        start = self._blob + offset
+        if start + length > len(self._data):
+            msg = f"{self.file} has an entry outside the file"
+            raise CompactSecretsError(msg)
+        return self._data[start : start + length]
+
+    def _key_bytes(self, index: int) -> bytes:
+        key_offset, _, key_length, _ = self._entry(index)
+        return self._slice(key_offset, key_length)
+
+    def _value(self, index: int) -> str | None:
+        _, value_offset, _, value_length = self._entry(index)
+        if value_length == _NO_VALUE:
+            return None
+        try:
+            return self._slice(value_offset, value_length).decode()
+        except UnicodeDecodeError as e:
+            msg = f"{self.file} has a value that is not valid UTF-8"
+            raise CompactSecretsError(msg) from e
+
+    def _find(self, key: bytes) -> int | None:
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_bytes(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._key_bytes(low) == key:
+            return low
+        return None
+
+    def __getitem__(self, key: str) -> str | None:
+        index = self._find(key.encode())
+        if index is None:
+            raise KeyError(key)
+        return self._value(index)
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._find(key.encode()) is not None
+
+    @cached_property
+    def _keys(self) -> tuple[str, ...]:
+        try:
+            return tuple(
+                self._key_bytes(index).decode() for index in range(self._count)
+            )
+        except UnicodeDecodeError as e:
+            msg = f"{self.file} has a key that is not valid UTF-8"
+            raise CompactSecretsError(msg) from e
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._data.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
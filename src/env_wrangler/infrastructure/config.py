@@ -28,5 +28,63 @@ LOG_FILE = Path("~/.env-wrangler/env-wrangler.log").expanduser()
 if not LOG_FILE.exists():
     LOG_FILE.touch()  # pragma: no cover
 
+SNAPSHOT_DIR = Path("~/.env-wrangler/snapshots").expanduser()
+JOURNAL_DIR = Path("~/.env-wrangler/journals").expanduser()
+
 with CONFIG_FILE.open("rb") as f:
     config = tomllib.load(f)
+
+PROJECT_CONFIG_NAME = ".env-wrangler.toml"
+
+
+class ConfigResolver:
+    """Resolve the effective settings for a directory.
+
+    Project configs (`.env-wrangler.toml`) found in the directory or any of
+    its parents override the global `[default]` section, nearest last. Each
+    directory's merged view is memoized and reused by its children; parsed
+    files and merged views are only rebuilt when a config file's mtime
+    changes, so bulk runs never re-parse TOML.
+    """
+
+    def __init__(self, filename: str = PROJECT_CONFIG_NAME) -> None:
+        self.filename = filename
+        self._parsed: dict[Path, tuple[int, dict]] = {}
+        self._merged: dict[Path, tuple[dict, int | None, dict]] = {}
+
+    def _load(self, file: Path, mtime: int) -> dict:
+        cached = self._parsed.get(file)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with file.open("rb") as f:
+            section = tomllib.load(f).get("default", {})
+        self._parsed[file] = (mtime, section)
+        return section
+
+    def resolve(self, directory: Path, defaults: dict) -> dict:
+        """Return `defaults` merged with every project config above `directory`."""
+        directory = Path(directory).expanduser().absolute()
+        parent = directory.parent
+        inherited = defaults if parent == directory else self.resolve(parent, defaults)
+
+        file = directory / self.filename
+        try:
+            mtime: int | None = file.stat().st_mtime_ns
+        except OSError:
+            mtime = None
+
+        cached = self._merged.get(directory)
+        if cached and cached[0] is inherited and cached[1] == mtime:
+            return cached[2]
+
+        merged = inherited if mtime is None else inherited | self._load(file, mtime)
+        self._merged[directory] = (inherited, mtime, merged)
+        return merged
+
+    def clear(self) -> None:
+        """Drop all cached files and merged views."""
+        self._parsed.clear()
+        self._merged.clear()
+
+
+config_resolver = ConfigResolver()
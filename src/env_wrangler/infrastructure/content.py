@@ -0,0 +1,158 @@
+"""Infrastructure helpers for env content held in memory."""
+
+import io
+from collections.abc import Iterable
+from collections.abc import Mapping
+
+from dotenv import dotenv_values
+
+from env_wrangler.domain.secrets import MASK
+from env_wrangler.domain.secrets import should_mask
+from env_wrangler.infrastructure.env_index import EnvEntry
+from env_wrangler.infrastructure.env_index import encode_value
+from env_wrangler.infrastructure.env_index import index_env_bytes
+from env_wrangler.infrastructure.env_index import patch_env_bytes
+
+EnvContent = str | bytes | Iterable[str] | Iterable[bytes]
+
+
+def to_bytes(content: EnvContent) -> bytes:
+    """Normalize env content to bytes.
+
+    Iterables are treated as lines; a newline is added to lines that do not
+    already end with one, so both `readlines()` and `splitlines()` work.
+    Mappings have no byte form and raise TypeError.
+    """
+    if isinstance(content, Mapping):
+        msg = "Mappings are already parsed and cannot be converted to bytes"
+        raise TypeError(msg)
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, str):
+        return content.encode()
+
+    lines = [line.encode() if isinstance(line, str) else line for line in content]
+    return b"".join(line if line.endswith(b"\n") else line + b"\n" for line in lines)
+
+
+def _normalize(content: EnvContent) -> tuple[bytes, bool]:
+    """Return content as bytes and whether the caller passed bytes."""
+    if not isinstance(content, str | bytes):
+        content = list(content)
+        return to_bytes(content), bool(content) and isinstance(content[0], bytes)
+    return to_bytes(content), isinstance(content, bytes)
+
+
+def parse_env(content: EnvContent | Mapping, interpolate: bool = True) -> dict:
+    """Parse env content into a dict; mappings are returned as a copy."""
+    if isinstance(content, Mapping):
+        return dict(content)
+    stream = io.StringIO(to_bytes(content).decode())
+    return dotenv_values(stream=stream, interpolate=interpolate)
+
+
+def _replacement(key: str, replacements: Mapping, substring: bool = True) -> str | None:
+    """Return the value to restore for `key`, if any."""
+    value = replacements.get(key)
+    if value is None and substring:
+        # Fall back to substring matching, last match wins; only the
+        # matching values are fetched, which keeps lazy mappings lazy
+        matches = [name for name in replacements if name in key]
+        if matches:
+            value = replacements[matches[-1]]
+    return value
+
+
+def mask_patches(
+    data: bytes,
+    filter_keys: list[str],
+    ignore_keys: list[str] | None = None,
+    extra_keys: list[str] | None = None,
+) -> list[tuple[EnvEntry, bytes]]:
+    """Return the `(entry, mask)` patches for values that should be masked."""
+    ignore_keys = ignore_keys or []
+    extra_keys = extra_keys or []
+
+    return [
+        (entry, MASK.encode())
+        for entry in index_env_bytes(data)
+        if should_mask(entry.key, filter_keys, ignore_keys, extra_keys)
+    ]
+
+
+def unmask_patches(
+    data: bytes, replacements: Mapping, substring: bool = True
+) -> list[tuple[EnvEntry, bytes]]:
+    """Return the `(entry, value)` patches that restore values.
+
+    Keys are looked up exactly, falling back to substring matching unless
+    `substring` is False (for replacements already keyed exactly, which
+    then only need one lookup per entry).
+    """
+    patches = []
+    for entry in index_env_bytes(data):
+        value = _replacement(entry.key, replacements, substring)
+        if value is not None:
+            patches.append((entry, encode_value(value, entry.quote)))
+    return patches
+
+
+def mask_env_bytes(
+    data: bytes,
+    filter_keys: list[str],
+    ignore_keys: list[str] | None = None,
+    extra_keys: list[str] | None = None,
+) -> bytes | None:
+    """Mask matching values; returns None when nothing changes."""
+    return patch_env_bytes(
+        data, mask_patches(data, filter_keys, ignore_keys, extra_keys)
+    )
+
+
+def unmask_env_bytes(data: bytes, replacements: Mapping) -> bytes | None:
+    """Restore values from `replacements`; returns None when nothing changes."""
+    return patch_env_bytes(data, unmask_patches(data, replacements))
+
+
+def mask_env(
+    content: EnvContent | Mapping,
+    filter_keys: list[str],
+    ignore_keys: list[str] | None = None,
+    extra_keys: list[str] | None = None,
+) -> str | bytes | dict:
+    """Mask env content, preserving its formatting.
+
+    Returns bytes for bytes input (or lines of bytes), a dict for a mapping
+    and str otherwise.
+    """
+    if isinstance(content, Mapping):
+        return {
+            key: MASK
+            if should_mask(key, filter_keys, ignore_keys or [], extra_keys or [])
+            else value
+            for key, value in content.items()
+        }
+    data, as_bytes = _normalize(content)
+    masked = mask_env_bytes(data, filter_keys, ignore_keys, extra_keys)
+    result = data if masked is None else masked
+    return result if as_bytes else result.decode()
+
+
+def unmask_env(
+    content: EnvContent | Mapping, replacements: Mapping
+) -> str | bytes | dict:
+    """Unmask env content, preserving its formatting.
+
+    Returns bytes for bytes input (or lines of bytes), a dict for a mapping
+    and str otherwise.
+    """
+    if isinstance(content, Mapping):
+        restored = {key: _replacement(key, replacements) for key in content}
+        return {
+            key: value if restored[key] is None else restored[key]
+            for key, value in content.items()
+        }
+    data, as_bytes = _normalize(content)
+    unmasked = unmask_env_bytes(data, replacements)
+    result = data if unmasked is None else unmasked
+    return result if as_bytes else result.decode()
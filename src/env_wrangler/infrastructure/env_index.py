@@ -0,0 +1,172 @@
+"""Infrastructure helpers for indexing values in env files by byte offset."""
+
+import re
+from dataclasses import dataclass
+
+_ASSIGNMENT_RE = re.compile(rb"[ \t]*(?:export[ \t]+)?([^=\s#]+)[ \t]*=[ \t]*")
+_QUOTES = (b"'", b'"')
+_QUOTED_BODY_RE = {
+    quote: re.compile(rb"(?:[^\\" + quote + rb"]|\\.)*" + quote, re.DOTALL)
+    for quote in _QUOTES
+}
+
+# Per quote style: what must be escaped and how. A backslash is doubled only
+# when dotenv would otherwise read it as the start of an escape sequence.
+_ESCAPES = {
+    b"'": (
+        re.compile(rb"\\(?=[\\']|\Z)|'"),
+        {b"\\": b"\\\\", b"'": b"\\'"},
+    ),
+    b'"': (
+        re.compile(rb'\\(?=[\\\'"abfnrtv]|\Z)|["\n\r\t\x07\x08\x0b\x0c]'),
+        {
+            b"\\": b"\\\\",
+            b'"': b'\\"',
+            b"\n": b"\\n",
+            b"\r": b"\\r",
+            b"\t": b"\\t",
+            b"\x07": b"\\a",
+            b"\x08": b"\\b",
+            b"\x0b": b"\\v",
+            b"\x0c": b"\\f",
+        },
+    ),
+}
+
+# Unquoted values lose line breaks, inline comments and surrounding space,
+# and a leading quote would start a quoted value
+_UNSAFE_UNQUOTED_RE = re.compile(rb"[\r\n]|\s#|\A[\s'\"]|\s\Z")
+
+
+@dataclass(frozen=True, slots=True)
+class EnvEntry:
+    """A single `KEY=value` assignment and the byte span of its value.
+
+    For quoted values the span excludes the quotes, so patching the span
+    keeps the original quoting, `export` prefix and inline comment intact.
+    """
+
+    key: str
+    start: int
+    end: int
+    quote: bytes = b""
+
+    def value(self, data: bytes) -> bytes:
+        """Return the raw value bytes of this entry."""
+        return data[self.start : self.end]
+
+
+def _find_closing_quote(data: bytes, pos: int, quote: bytes) -> int:
+    """Return the offset of the unescaped closing quote, or -1."""
+    match = _QUOTED_BODY_RE[quote].match(data, pos)
+    return match.end() - 1 if match else -1
+
+
+def _unquoted_end(data: bytes, start: int, line_end: int) -> int:
+    """Return the end of an unquoted value, before any inline comment."""
+    end = line_end
+    comment = re.search(rb"[ \t]#", data[start:line_end])
+    if comment:
+        end = start + comment.start()
+    while end > start and data[end - 1 : end] in (b" ", b"\t", b"\r"):
+        end -= 1
+    return end
+
+
+def index_env_range(
+    data: bytes, start: int = 0, stop: int | None = None
+) -> tuple[list[EnvEntry], int]:
+    """Index the assignments on lines starting in `[start, stop)`.
+
+    `start` must be the beginning of a line. A quoted value opened before
+    `stop` is followed to its closing quote even past `stop`; the returned
+    offset is where the next unparsed line starts.
+    """
+    entries: list[EnvEntry] = []
+    pos = start
+    size = len(data)
+    stop = size if stop is None else min(stop, size)
+    while pos < stop:
+        line_end = data.find(b"\n", pos)
+        if line_end == -1:
+            line_end = size
+
+        match = _ASSIGNMENT_RE.match(data, pos, line_end)
+        if not match:
+            pos = line_end + 1
+            continue
+
+        key = match.group(1).decode()
+        value_start = match.end()
+        quote = data[value_start : value_start + 1]
+        if quote in _QUOTES:
+            close = _find_closing_quote(data, value_start + 1, quote)
+            if close != -1:
+                entries.append(EnvEntry(key, value_start + 1, close, quote))
+                next_line = data.find(b"\n", close)
+                pos = size if next_line == -1 else next_line + 1
+                continue
+
+        value_end = _unquoted_end(data, value_start, line_end)
+        entries.append(EnvEntry(key, value_start, value_end))
+        pos = line_end + 1
+
+    return entries, min(pos, size)
+
+
+def index_env_bytes(data: bytes) -> list[EnvEntry]:
+    """Parse env content and return every assignment in file order.
+
+    Quoted values may span several lines; blank lines, comments and
+    unparseable lines are skipped.
+    """
+    return index_env_range(data)[0]
+
+
+def _needs_quotes(raw: bytes) -> bool:
+    """Return True when dotenv would not read `raw` back verbatim unquoted."""
+    return bool(_UNSAFE_UNQUOTED_RE.search(raw))
+
+
+def encode_value(value: str, quote: bytes) -> bytes:
+    """Encode a value for writing inside the given quote style.
+
+    Only what python-dotenv would otherwise decode differently is escaped,
+    so values read from a file are written back byte-for-byte. An unquoted
+    value that would not survive unquoted (e.g. a multi-line PEM restored
+    into `KEY=********`) is wrapped in double quotes.
+    """
+    raw = value.encode()
+    if not quote:
+        if not _needs_quotes(raw):
+            return raw
+        return b'"' + encode_value(value, b'"') + b'"'
+    pattern, escapes = _ESCAPES[quote]
+    return pattern.sub(lambda match: escapes[match.group()], raw)
+
+
+def changed_patches(
+    data: bytes, patches: list[tuple[EnvEntry, bytes]]
+) -> list[tuple[EnvEntry, bytes]]:
+    """Drop patches that would leave their span unchanged."""
+    return [(entry, value) for entry, value in patches if entry.value(data) != value]
+
+
+def patch_env_bytes(data: bytes, patches: list[tuple[EnvEntry, bytes]]) -> bytes | None:
+    """Replace value spans and return the new content.
+
+    Everything outside the patched spans is kept byte-for-byte. Returns None
+    when no patch changes its span, so callers can skip the rewrite.
+    """
+    patches = changed_patches(data, patches)
+    if not patches:
+        return None
+
+    chunks = []
+    pos = 0
+    for entry, value in sorted(patches, key=lambda patch: patch[0].start):
+        chunks.append(data[pos : entry.start])
+        chunks.append(value)
+        pos = entry.end
+    chunks.append(data[pos:])
+    return b"".join(chunks)
@@ -0,0 +1,205 @@
+"""Infrastructure helpers for writing sorted secrets files in bounded memory."""
+
+import heapq
+import json
+import os
+import tempfile
+from collections.abc import Iterable
+from collections.abc import Iterator
+from itertools import groupby
+from pathlib import Path
+from typing import IO
+from typing import Any
+
+# Approximate bytes of key/value data held in memory before a run is spilled
+MEMORY_BUDGET = 64 * 1024 * 1024
+READ_SIZE = 1024 * 1024
+_ITEM_OVERHEAD = 100
+
+
+def spill_run(items: Iterable[tuple], directory: str | Path) -> Path:
+    """Write already sorted, JSON-serializable tuples to a run file."""
+    fd, name = tempfile.mkstemp(dir=directory, suffix=".run")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(item) + "\n" for item in items)
+    return Path(name)
+
+
+def read_run(file: Path) -> Iterator[tuple]:
+    """Stream the tuples of a run file written by `spill_run`."""
+    with file.open(encoding="utf-8") as f:
+        for line in f:
+            yield tuple(json.loads(line))
+
+
+def _spill(run: list[tuple[str, int, Any]], directory: str) -> Path:
+    """Sort a run and write it to a temporary JSON-lines file."""
+    run.sort(key=lambda item: (item[0], item[1]))
+    return spill_run(run, directory)
+
+
+def merge_sorted(
+    sources: Iterable[Iterable[tuple[str, Any]]],
+    memory_budget: int | None = None,
+    spill_dir: Path | None = None,
+) -> Iterator[tuple[str, Any]]:
+    """Yield `(key, value)` pairs from all sources in key order.
+
+    Items are buffered until `memory_budget` (default `MEMORY_BUDGET`) is
+    exceeded, then sorted and spilled to disk as runs; all runs are combined
+    with a k-way merge. For duplicate keys the last occurrence wins, with later
+    sources overriding earlier ones, matching `dict.update` semantics.
+
+    Runs hold plaintext values, so callers should pass a `spill_dir` next to
+    the file being written rather than rely on the system temp directory.
+    """
+    if memory_budget is None:
+        memory_budget = MEMORY_BUDGET
+    with tempfile.TemporaryDirectory(
+        prefix=".env-wrangler-", dir=spill_dir
+    ) as directory:
+        run_files: list[Path] = []
+        run: list[tuple[str, int, Any]] = []
+        size = 0
+        seq = 0
+        for source in sources:
+            for key, value in source:
+                run.append((key, seq, value))
+                seq += 1
+                size += len(key) + len(str(value)) + _ITEM_OVERHEAD
+                if size > memory_budget:
+                    run_files.append(_spill(run, directory))
+                    run = []
+                    size = 0
+
+        run.sort(key=lambda item: (item[0], item[1]))
+        runs = [read_run(file) for file in run_files] + [iter(run)]
+        merged = heapq.merge(*runs, key=lambda item: (item[0], item[1]))
+        for key, items in groupby(merged, key=lambda item: item[0]):
+            *_, last = items
+            yield key, last[2]
+
+
+def iter_env_items(file: Path) -> Iterator[tuple[str, str]]:
+    """Stream `KEY=value` pairs from a secrets env file."""
+    with file.open() as f:
+        for physical_line in f:
+            for line in physical_line.splitlines():
+                if line:
+                    key, value = line.split("=", 1)
+                    yield key, value
+
+
+class _JsonObjectReader:
+    """Incrementally decode the members of a top-level JSON object."""
+
+    def __init__(self, stream: IO[str], name: str) -> None:
+        self.stream = stream
+        self.name = name
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        chunk = self.stream.read(READ_SIZE)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return not self.eof
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character ('' at EOF)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos].isspace():
+                self.pos += 1
+            if self.pos < len(self.buffer) or not self.fill():
+                return self.buffer[self.pos : self.pos + 1]
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            msg = f"Expected {char!r} in {self.name}"
+            raise ValueError(msg)
+        self.pos += 1
+
+    def decode(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number may continue past the end of the buffer
+            if end == len(self.buffer) and not self.eof and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def __iter__(self) -> Iterator[tuple[str, Any]]:
+        self.expect("{")
+        if self.peek() == "}":
+            return
+        while True:
+            key = self.decode()
+            self.expect(":")
+            yield key, self.decode()
+            if self.peek() == "}":
+                return
+            self.expect(",")
+
+
+def iter_json_items(file: Path) -> Iterator[tuple[str, Any]]:
+    """Stream the members of a top-level JSON object without loading it whole."""
+    with file.open(encoding="utf-8") as f:
+        yield from _JsonObjectReader(f, str(file))
+
+
+def _replace_atomically(file: Path, lines: Iterator[str]) -> None:
+    fd, name = tempfile.mkstemp(dir=file.parent, prefix=f".{file.name}.")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        if file.exists():
+            os.chmod(name, file.stat().st_mode)  # noqa: PTH101
+        Path(name).replace(file)
+    except BaseException:
+        Path(name).unlink(missing_ok=True)
+        raise
+
+
+def _env_lines(items: Iterator[tuple[str, Any]]) -> Iterator[str]:
+    separator = ""
+    for key, value in items:
+        yield f"{separator}{key}={value}"
+        separator = "\n"
+
+
+def _json_lines(items: Iterator[tuple[str, Any]]) -> Iterator[str]:
+    opener = "{\n"
+    for key, value in items:
+        rendered = json.dumps(value, indent=2, sort_keys=True).replace("\n", "\n  ")
+        yield f"{opener}  {json.dumps(key)}: {rendered}"
+        opener = ",\n"
+    yield "{}" if opener == "{\n" else "\n}"
+
+
+def write_sorted_env(
+    file: Path,
+    sources: list[Iterable[tuple[str, Any]]],
+    memory_budget: int | None = None,
+) -> None:
+    """Merge sources and write them as sorted `KEY=value` lines."""
+    items = merge_sorted(sources, memory_budget, spill_dir=file.parent)
+    _replace_atomically(file, _env_lines(items))
+
+
+def write_sorted_json(
+    file: Path,
+    sources: list[Iterable[tuple[str, Any]]],
+    memory_budget: int | None = None,
+) -> None:
+    """Merge sources and write them like `json.dumps(indent=2, sort_keys=True)`."""
+    items = merge_sorted(sources, memory_budget, spill_dir=file.parent)
+    _replace_atomically(file, _json_lines(items))
@@ -1,87 +1,119 @@
 """Infrastructure helpers for file IO."""
 
 import json
+from collections.abc import Mapping
 from pathlib import Path
 
-from dotenv import dotenv_values
-
-
-def envs_to_dict(env_files: list[str]) -> dict:
-    """Read env files, merge them and return a dict."""
+from env_wrangler.infrastructure.chunks import PARALLEL_THRESHOLD
+from env_wrangler.infrastructure.chunks import large_env_to_dict
+from env_wrangler.infrastructure.chunks import mask_large_env_file
+from env_wrangler.infrastructure.content import mask_patches
+from env_wrangler.infrastructure.content import parse_env
+from env_wrangler.infrastructure.content import unmask_patches
+from env_wrangler.infrastructure.env_index import changed_patches
+from env_wrangler.infrastructure.env_index import patch_env_bytes
+from env_wrangler.infrastructure.external_sort import iter_env_items
+from env_wrangler.infrastructure.external_sort import iter_json_items
+from env_wrangler.infrastructure.external_sort import write_sorted_env
+from env_wrangler.infrastructure.external_sort import write_sorted_json
+
+
+def _is_large(file_path: Path | str) -> bool:
+    try:
+        return Path(file_path).stat().st_size >= PARALLEL_THRESHOLD
+    except OSError:
+        return False
+
+
+def envs_to_dict(env_files: list[str], interpolate: bool = True) -> dict:
+    """Read env files, merge them and return a dict.
+
+    Files are parsed with `parse_env`; missing files are skipped and very
+    large files are parsed in parallel chunks.
+    """
     config = {}
     for env_file in env_files:
-        config |= dotenv_values(env_file)
+        if _is_large(env_file):
+            config |= large_env_to_dict(env_file, interpolate=interpolate)
+        elif Path(env_file).is_file():
+            config |= parse_env(Path(env_file).read_bytes(), interpolate=interpolate)
     return config
 
 
 def save_dict_to_json_file(data: dict, file_path: Path | str) -> Path | None:
-    """Save a dictionary to a JSON file (non-destructive)."""
+    """Save a dictionary to a JSON file (non-destructive).
+
+    Existing entries are streamed and merged on disk, so memory stays bounded
+    however large the file grows.
+    """
     if not data:
         return None
 
     file_path = Path(file_path).expanduser()
-    if file_path.exists():
-        existing_data = json.loads(file_path.read_text())
-        existing_data.update(data)
-        data = existing_data
-
-    file_path.write_text(json.dumps(data, indent=2, sort_keys=True))
+    sources = [iter_json_items(file_path)] if file_path.exists() else []
+    write_sorted_json(file_path, [*sources, data.items()])
     return file_path
 
 
 def save_dict_to_env_file(data: dict, file_path: Path | str) -> Path | None:
-    """Save a dictionary to an env file (non-destructive)."""
+    """Save a dictionary to an env file (non-destructive).
+
+    Existing entries are streamed and merged on disk, so memory stays bounded
+    however large the file grows.
+    """
     if not data:
         return None
 
     file_path = Path(file_path).expanduser()
-    if file_path.exists():
-        existing_data = dict(
-            line.split("=", 1) for line in file_path.read_text().splitlines() if line
-        )
-        existing_data.update(data)
-        data = existing_data
-
-    env_content = "\n".join([f"{key}={value}" for key, value in sorted(data.items())])
-    file_path.write_text(env_content)
+    sources = [iter_env_items(file_path)] if file_path.exists() else []
+    write_sorted_env(file_path, [*sources, data.items()])
     return file_path
 
 
+def _apply_patches(file_path: Path, data: bytes, patches: list) -> list[str]:
+    """Write the changed patches, returning the keys whose values changed."""
+    patches = changed_patches(data, patches)
+    if patches:
+        file_path.write_bytes(patch_env_bytes(data, patches))
+    return [entry.key for entry, _ in patches]
+
+
 def mask_sensitive_data_in_file(
-    file_path: str | Path, filter_keys: list[str], ignore_keys: list[str] | None = None
-) -> Path:
-    """Mask sensitive data in an env file."""
+    file_path: str | Path,
+    filter_keys: list[str],
+    ignore_keys: list[str] | None = None,
+    extra_keys: list[str] | None = None,
+) -> list[str]:
+    """Mask sensitive data in an env file and return the masked keys.
+
+    Keys containing any of `filter_keys` are masked, as are keys listed
+    exactly in `extra_keys` (e.g. derived secrets). Only the value spans are
+    patched; the file is not rewritten when nothing changes. Very large files
+    are classified in parallel chunks.
+    """
     file_path = Path(file_path).expanduser()
-    lines = file_path.read_text().splitlines()
-
-    ignore_keys = ignore_keys or []
+    if _is_large(file_path):
+        return mask_large_env_file(file_path, filter_keys, ignore_keys, extra_keys)
 
-    masked_lines = []
-    for line in lines:
-        for check_key in filter_keys:
-            key = line.split("=", 1)[0]
-            if check_key in key and key not in ignore_keys:
-                line = key + "=********"  # noqa: PLW2901
-        masked_lines.append(line)
+    data = file_path.read_bytes()
+    return _apply_patches(
+        file_path, data, mask_patches(data, filter_keys, ignore_keys, extra_keys)
+    )
 
-    file_path.write_text("\n".join(masked_lines))
-    return file_path
 
+def unmask_sensitive_data_in_file(
+    file_path: str | Path, replacements: Mapping, substring: bool = True
+) -> list[str]:
+    """Unmask sensitive data in an env file and return the restored keys.
 
-def unmask_sensitive_data_in_file(file_path: str | Path, replacements: dict) -> Path:
-    """Unmask sensitive data in an env file."""
+    Only the value spans are patched; quoting, comments and line endings are
+    preserved and the file is not rewritten when nothing changes. With
+    `substring=False` only exact keys are restored.
+    """
     file_path = Path(file_path).expanduser()
-    lines = file_path.read_text().splitlines()
-
-    replaced_lines = []
-    for line in lines:
-        for key, value in replacements.items():
-            if key in line.split("=", 1)[0]:
-                line = line.split("=", 1)[0] + "=" + value  # noqa: PLW2901
-        replaced_lines.append(line)
-
-    file_path.write_text("\n".join(replaced_lines))
-    return file_path
+    data = file_path.read_bytes()
+    patches = unmask_patches(data, replacements, substring)
+    return _apply_patches(file_path, data, patches)
 
 
 def json_to_env(json_file_path: str | Path, env_file_path: str | Path) -> Path:
@@ -0,0 +1,67 @@
+"""Infrastructure helpers for the bulk-run checkpoint journal."""
+
+import hashlib
+import json
+from datetime import UTC
+from datetime import datetime
+from pathlib import Path
+
+from env_wrangler.infrastructure.config import JOURNAL_DIR
+
+
+def journal_path(operation: str, paths: list[Path]) -> Path:
+    """Return the journal file for an operation over a set of directories."""
+    names = sorted(str(Path(path).expanduser().resolve()) for path in paths)
+    digest = hashlib.sha256("\n".join([operation, *names]).encode()).hexdigest()
+    return JOURNAL_DIR / f"{operation}-{digest[:16]}.jsonl"
+
+
+class Journal:
+    """Append-only record of which directories a bulk run has finished.
+
+    Each finished directory is appended as one JSON line and flushed
+    immediately, so an interrupted run leaves an accurate record behind.
+    """
+
+    def __init__(self, file: Path, resume: bool = False) -> None:
+        self.file = Path(file)
+        self.completed: set[str] = set()
+        if resume and self.file.exists():
+            for line in self.file.read_text().splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A torn final line from an interrupted run
+                if entry.get("status") == "done":
+                    self.completed.add(entry["path"])
+
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self._stream = self.file.open("a" if resume else "w", encoding="utf-8")
+
+    @staticmethod
+    def _key(path: Path) -> str:
+        return str(Path(path).expanduser().resolve())
+
+    def is_done(self, path: Path) -> bool:
+        """Return True when `path` completed in a previous run."""
+        return self._key(path) in self.completed
+
+    def record(self, path: Path, status: str, error: str | None = None) -> None:
+        """Append the outcome for a directory."""
+        entry = {
+            "path": self._key(path),
+            "status": status,
+            "time": datetime.now(tz=UTC).isoformat(),
+        }
+        if error:
+            entry["error"] = error
+        self._stream.write(json.dumps(entry, sort_keys=True) + "\n")
+        self._stream.flush()
+        if status == "done":
+            self.completed.add(entry["path"])
+
+    def close(self, discard: bool = False) -> None:
+        """Close the journal, deleting it when `discard` is set."""
+        self._stream.close()
+        if discard:
+            self.file.unlink(missing_ok=True)
@@ -0,0 +1,166 @@
+"""Infrastructure helpers for sweeping a source tree for secret values."""
+
+import mmap
+import os
+import re
+import shutil
+import subprocess
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+
+BINARY_SNIFF_BYTES = 8192
+SCAN_CHUNK_SIZE = 64
+
+_worker_pattern: re.Pattern[bytes] | None = None
+
+
+def _git_files(root: Path) -> list[Path] | None:
+    """List tracked and untracked, non-ignored files using git, if possible.
+
+    Works for any directory inside a work tree: git applies the ignore rules
+    of parent directories and negations, and lists paths relative to `root`.
+    """
+    git = shutil.which("git")
+    if not git or not root.is_dir():
+        return None
+    try:
+        result = subprocess.run(  # noqa: S603
+            [git, "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+            cwd=root,
+            capture_output=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return [root / os.fsdecode(name) for name in result.stdout.split(b"\0") if name]
+
+
+def _read_gitignore(directory: Path) -> list[str]:
+    try:
+        lines = (directory / ".gitignore").read_text().splitlines()
+    except OSError:
+        return []
+    return [
+        line.strip()
+        for line in lines
+        if line.strip() and not line.startswith(("#", "!"))
+    ]
+
+
+def _is_ignored(rel_path: str, name: str, is_dir: bool, patterns: list[str]) -> bool:
+    for pattern in patterns:
+        if pattern.endswith("/"):
+            if not is_dir:
+                continue
+            pattern = pattern.rstrip("/")  # noqa: PLW2901
+        if "/" in pattern:
+            if fnmatch(rel_path, pattern.lstrip("/")):
+                return True
+        elif fnmatch(name, pattern):
+            return True
+    return False
+
+
+def _walk_files(root: Path) -> Iterator[Path]:
+    """Walk `root`, applying (non-negated) .gitignore patterns per directory.
+
+    Only used outside a git work tree.
+    """
+    stack: list[tuple[Path, list[tuple[Path, list[str]]]]] = [(root, [])]
+    while stack:
+        directory, inherited = stack.pop()
+        rules = inherited + [(directory, _read_gitignore(directory))]
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name == ".git":
+                continue
+            is_dir = entry.is_dir(follow_symlinks=False)
+            path = Path(entry.path)
+            if any(
+                _is_ignored(
+                    path.relative_to(base).as_posix(), entry.name, is_dir, patterns
+                )
+                for base, patterns in rules
+            ):
+                continue
+            if is_dir:
+                stack.append((path, rules))
+            elif entry.is_file(follow_symlinks=False):
+                yield path
+
+
+def iter_repo_files(root: Path | str) -> Iterator[Path]:
+    """Yield every file under `root` that is not ignored by .gitignore."""
+    root = Path(root).expanduser()
+    files = _git_files(root)
+    if files is None:
+        yield from _walk_files(root)
+        return
+    for file in files:
+        if file.is_file():
+            yield file
+
+
+def scan_file(file: Path, pattern: re.Pattern[bytes]) -> list[tuple[int, bytes]]:
+    """Return `(line, match)` for every pattern hit in a text file.
+
+    The file is memory-mapped so the regex runs over the page cache without
+    copying it into Python. Empty, unreadable and binary files are skipped.
+    """
+    try:
+        with file.open("rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                if b"\0" in data[:BINARY_SNIFF_BYTES]:
+                    return []
+                hits = []
+                line = 1
+                last = 0
+                for match in pattern.finditer(data):
+                    line += data[last : match.start()].count(b"\n")
+                    last = match.start()
+                    hits.append((line, match.group()))
+                return hits
+    except (OSError, ValueError):
+        return []
+
+
+def _init_worker(source: bytes) -> None:
+    global _worker_pattern  # noqa: PLW0603
+    _worker_pattern = re.compile(source)
+
+
+def _scan_in_worker(file: Path) -> tuple[Path, list[tuple[int, bytes]]]:
+    assert _worker_pattern is not None
+    return file, scan_file(file, _worker_pattern)
+
+
+def scan_files(
+    files: Iterable[Path], pattern: re.Pattern[bytes], workers: int | None = None
+) -> Iterator[tuple[Path, int, bytes]]:
+    """Scan files for pattern hits, fanning out across a process pool.
+
+    `workers=1` scans in-process; otherwise each worker compiles the pattern
+    once and files are handed out in chunks.
+    """
+    if workers == 1:
+        for file in files:
+            for line, match in scan_file(file, pattern):
+                yield file, line, match
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(pattern.pattern,)
+    ) as executor:
+        for file, hits in executor.map(
+            _scan_in_worker, files, chunksize=SCAN_CHUNK_SIZE
+        ):
+            for line, match in hits:
+                yield file, line, match
@@ -0,0 +1,230 @@
+"""Infrastructure helpers for content-addressed env file snapshots."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import UTC
+from datetime import datetime
+from pathlib import Path
+
+from env_wrangler.infrastructure.config import SNAPSHOT_DIR
+
+# Snapshots kept per directory; older manifests are pruned on each snapshot
+SNAPSHOT_RETENTION = 20
+# Blobs written or reused this recently are never garbage-collected, so a
+# concurrent snapshot of another directory cannot lose its blobs
+BLOB_GRACE_SECONDS = 3600
+# Pruning triggers a store-wide garbage collection at most this often; GC
+# reads every manifest, so it must not run on every snapshot of a bulk run
+GC_INTERVAL_SECONDS = 24 * 3600
+GC_MARKER = ".last-gc"
+LATEST = "LATEST"
+
+
+def _root(store: Path | None) -> Path:
+    return Path(store) if store else SNAPSHOT_DIR
+
+
+def _atomic_write(file: Path, data: bytes) -> None:
+    file.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=file.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        Path(tmp).replace(file)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def _manifest_dir(directory: Path, store: Path | None) -> Path:
+    key = hashlib.sha256(str(directory.expanduser().resolve()).encode()).hexdigest()
+    return _root(store) / "manifests" / key[:16]
+
+
+def _blob_path(digest: str, store: Path | None) -> Path:
+    return _root(store) / "objects" / digest[:2] / digest[2:]
+
+
+def store_blob(data: bytes, store: Path | None = None) -> str:
+    """Store content once under its SHA-256 digest and return the digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    blob = _blob_path(digest, store)
+    if blob.exists():
+        # Mark the blob as in use for garbage collection
+        os.utime(blob)
+    else:
+        _atomic_write(blob, data)
+    return digest
+
+
+def load_blob(digest: str, store: Path | None = None) -> bytes:
+    """Return the content stored under a digest."""
+    return _blob_path(digest, store).read_bytes()
+
+
+def _manifests(directory: Path, store: Path | None) -> list[Path]:
+    """Return a directory's manifest files, oldest first, without reading them."""
+    return sorted(_manifest_dir(directory, store).glob("*.json"))
+
+
+def _read_manifest(manifest: Path) -> dict:
+    return json.loads(manifest.read_text())
+
+
+def _latest_snapshot(directory: Path, store: Path | None) -> dict | None:
+    """Return the latest snapshot through the directory's latest pointer."""
+    manifest_dir = _manifest_dir(directory, store)
+    try:
+        latest = (manifest_dir / LATEST).read_text().strip()
+        return _read_manifest(manifest_dir / f"{latest}.json")
+    except (OSError, ValueError):
+        manifests = _manifests(directory, store)
+        return _read_manifest(manifests[-1]) if manifests else None
+
+
+def list_snapshots(directory: Path, store: Path | None = None) -> list[dict]:
+    """Return the snapshots of a directory, oldest first."""
+    return [_read_manifest(manifest) for manifest in _manifests(directory, store)]
+
+
+def collect_garbage(store: Path | None = None) -> int:
+    """Delete blobs no manifest references; return how many were deleted."""
+    root = _root(store)
+    referenced = {
+        digest
+        for manifest in root.glob("manifests/*/*.json")
+        for digest in _read_manifest(manifest)["files"].values()
+    }
+    cutoff = time.time() - BLOB_GRACE_SECONDS
+    deleted = 0
+    for blob in root.glob("objects/*/*"):
+        digest = blob.parent.name + blob.name
+        if digest not in referenced and blob.stat().st_mtime < cutoff:
+            blob.unlink(missing_ok=True)
+            deleted += 1
+
+    marker = root / GC_MARKER
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    marker.touch()
+    return deleted
+
+
+def _gc_due(store: Path | None) -> bool:
+    try:
+        last = (_root(store) / GC_MARKER).stat().st_mtime
+    except OSError:
+        return True
+    return time.time() - last >= GC_INTERVAL_SECONDS
+
+
+def prune_snapshots(
+    directory: Path, keep: int = SNAPSHOT_RETENTION, store: Path | None = None
+) -> int:
+    """Keep the newest `keep` snapshots of a directory.
+
+    Unreferenced blobs are collected when something was pruned and the last
+    collection is older than `GC_INTERVAL_SECONDS`. Returns the number of
+    manifests removed.
+    """
+    stale = _manifests(directory, store)[:-keep] if keep > 0 else []
+    for manifest in stale:
+        manifest.unlink(missing_ok=True)
+    if stale and _gc_due(store):
+        collect_garbage(store)
+    return len(stale)
+
+
+def take_snapshot(
+    directory: Path,
+    files: list[Path],
+    store: Path | None = None,
+    keep: int = SNAPSHOT_RETENTION,
+) -> str | None:
+    """Snapshot the given files of a directory and return the snapshot id.
+
+    File contents are stored by digest, so identical files across
+    directories and runs are kept once. When nothing changed since the
+    latest snapshot of the directory, no new manifest is written and the
+    latest id is returned. Returns None when there are no files. Only the
+    newest `keep` snapshots are retained.
+    """
+    contents = {
+        file.relative_to(directory).as_posix(): store_blob(file.read_bytes(), store)
+        for file in files
+        if file.is_file()
+    }
+    if not contents:
+        return None
+
+    latest = _latest_snapshot(directory, store)
+    if latest and latest["files"] == contents:
+        return latest["id"]
+
+    snapshot_id = datetime.now(tz=UTC).strftime("%Y%m%dT%H%M%S%fZ")
+    manifest = {
+        "id": snapshot_id,
+        "path": str(directory.expanduser().resolve()),
+        "created": datetime.now(tz=UTC).isoformat(),
+        "files": contents,
+    }
+    manifest_dir = _manifest_dir(directory, store)
+    _atomic_write(
+        manifest_dir / f"{snapshot_id}.json",
+        json.dumps(manifest, indent=2, sort_keys=True).encode(),
+    )
+    _atomic_write(manifest_dir / LATEST, snapshot_id.encode())
+    prune_snapshots(directory, keep, store)
+    return snapshot_id
+
+
+def _digest_file(file: Path) -> str | None:
+    try:
+        return hashlib.sha256(file.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def select_snapshot(
+    directory: Path, snapshot_id: str | None = None, store: Path | None = None
+) -> dict:
+    """Return a snapshot by id, or the latest one that differs from the files.
+
+    Picking the latest *differing* snapshot means the default restore undoes
+    the most recent rewrite even when later runs left the files unchanged.
+    Manifests are read newest first and each current file is hashed once.
+    """
+    manifest_dir = _manifest_dir(directory, store)
+    if snapshot_id:
+        manifest = manifest_dir / f"{snapshot_id}.json"
+        if manifest.parent == manifest_dir and manifest.is_file():
+            return _read_manifest(manifest)
+    else:
+        current: dict[str, str | None] = {}
+        for manifest in reversed(_manifests(directory, store)):
+            snapshot = _read_manifest(manifest)
+            for name, digest in snapshot["files"].items():
+                if name not in current:
+                    current[name] = _digest_file(directory / name)
+                if current[name] != digest:
+                    return snapshot
+
+    msg = f"No snapshot found for {directory}"
+    raise FileNotFoundError(msg)
+
+
+def restore_snapshot(
+    directory: Path, snapshot: dict, store: Path | None = None
+) -> list[Path]:
+    """Write a snapshot's files back into a directory."""
+    restored = []
+    for name, digest in sorted(snapshot["files"].items()):
+        file = directory / name
+        data = load_blob(digest, store)
+        if not file.exists() or file.read_bytes() != data:
+            file.parent.mkdir(parents=True, exist_ok=True)
+            file.write_bytes(data)
+        restored.append(file)
+    return restored
@@ -0,0 +1,30 @@
+import pytest
+
+from env_wrangler.infrastructure import audit
+from env_wrangler.infrastructure import journal
+from env_wrangler.infrastructure import snapshots
+
+
+@pytest.fixture(autouse=True)
+def audit_log(tmp_path_factory, monkeypatch):
+    """Keep audit events out of the real ~/.env-wrangler log."""
+    log_file = tmp_path_factory.mktemp("audit") / "env-wrangler.log"
+    monkeypatch.setattr(audit, "LOG_FILE", log_file)
+    yield log_file
+    audit._shutdown()  # noqa: SLF001
+
+
+@pytest.fixture(autouse=True)
+def snapshot_store(tmp_path_factory, monkeypatch):
+    """Keep snapshots out of the real ~/.env-wrangler directory."""
+    store = tmp_path_factory.mktemp("snapshots")
+    monkeypatch.setattr(snapshots, "SNAPSHOT_DIR", store)
+    return store
+
+
+@pytest.fixture(autouse=True)
+def journal_dir(tmp_path_factory, monkeypatch):
+    """Keep bulk-run journals out of the real ~/.env-wrangler directory."""
+    directory = tmp_path_factory.mktemp("journals")
+    monkeypatch.setattr(journal, "JOURNAL_DIR", directory)
+    return directory
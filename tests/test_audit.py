@@ -0,0 +1,68 @@
+import json
+import logging
+
+from env_wrangler.application.secrets import mask_secrets
+from env_wrangler.application.secrets import unmask_secrets
+from env_wrangler.infrastructure import audit
+from env_wrangler.infrastructure.audit import AUDIT_LOGGER_NAME
+from env_wrangler.infrastructure.audit import start_audit_log
+from env_wrangler.infrastructure.audit import stop_audit_log
+
+
+def test_audit_log_writes_json_lines(tmp_path):
+    log_file = tmp_path / "audit.log"
+    listener = start_audit_log(log_file, batch_size=10)
+
+    logger = logging.getLogger(AUDIT_LOGGER_NAME)
+    logger.info("extract", extra={"audit": {"keys": ["SECRET_KEY"]}})
+    logger.info("mask", extra={"audit": {"keys": ["PASSWORD"]}})
+    stop_audit_log(listener)
+
+    events = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [event["event"] for event in events] == ["extract", "mask"]
+    assert events[0]["keys"] == ["SECRET_KEY"]
+    assert "time" in events[0]
+
+
+def test_audit_log_rotates_by_size(tmp_path):
+    log_file = tmp_path / "audit.log"
+    listener = start_audit_log(log_file, max_bytes=200, backup_count=2, batch_size=1)
+
+    logger = logging.getLogger(AUDIT_LOGGER_NAME)
+    for _ in range(20):
+        logger.info("mask", extra={"audit": {"keys": ["PASSWORD"]}})
+    stop_audit_log(listener)
+
+    assert (tmp_path / "audit.log.1").exists()
+    assert not (tmp_path / "audit.log.3").exists()
+
+
+def test_use_case_audits_keys_not_values(tmp_path, audit_log):
+    (tmp_path / ".env").write_text("SECRET_KEY=hunter2\nFOO=bar\n")
+
+    mask_secrets(tmp_path, ["SECRET"], [], [".env"])
+    audit._shutdown()  # noqa: SLF001
+
+    content = audit_log.read_text()
+    event = json.loads(content)
+    assert event["event"] == "mask"
+    assert event["keys"] == ["SECRET_KEY"]
+    assert "hunter2" not in content
+
+
+def test_use_case_audits_only_touched_keys_and_files(tmp_path, audit_log):
+    (tmp_path / ".env").write_text("SECRET_KEY=********\nFOO=bar\n")
+    (tmp_path / ".django").write_text("OTHER_SECRET=********\n")
+    (tmp_path / "secrets.json").write_text(
+        json.dumps({"SECRET_KEY": "hunter2", "UNUSED_SECRET": "x"})
+    )
+
+    mask_secrets(tmp_path, ["SECRET"], [], [".env"])
+    unmask_secrets(tmp_path, ["SECRET"], [".env", ".django"])
+    audit._shutdown()  # noqa: SLF001
+
+    mask_event, unmask_event = map(json.loads, audit_log.read_text().splitlines())
+    assert mask_event["keys"] == []
+    assert mask_event["files"] == []
+    assert unmask_event["keys"] == ["SECRET_KEY"]
+    assert unmask_event["files"] == [str(tmp_path / ".env")]
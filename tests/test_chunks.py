@@ -0,0 +1,51 @@
+from dotenv import dotenv_values
+
+from env_wrangler.infrastructure.chunks import chunk_ranges
+from env_wrangler.infrastructure.chunks import large_env_to_dict
+from env_wrangler.infrastructure.chunks import mask_large_env_file
+from env_wrangler.infrastructure.content import mask_env_bytes
+
+
+def make_env(tmp_path):
+    lines = []
+    for i in range(200):
+        lines.append(f"FLAG_{i}=value-{i}")
+        if i % 37 == 0:
+            lines.append(f'CERT_SECRET_{i}="line one\n# not a comment\nline three"')
+        if i % 50 == 0:
+            lines.append(f"URL_{i}=https://${{FLAG_{i}}}/x  # comment")
+            lines.append(f"export API_SECRET_{i}='s{i}'")
+    env_file = tmp_path / ".env"
+    env_file.write_text("\n".join(lines) + "\n")
+    return env_file
+
+
+def test_chunk_ranges_start_at_line_starts():
+    data = b"A=1\nB=2\nC=3\n"
+
+    ranges = chunk_ranges(data, chunk_size=5)
+
+    assert ranges == [(0, 8), (8, 12)]
+
+
+def test_large_env_to_dict_matches_dotenv(tmp_path):
+    env_file = make_env(tmp_path)
+
+    for chunk_size in (16, 100, 1000):
+        assert large_env_to_dict(env_file, chunk_size=chunk_size, workers=2) == (
+            dotenv_values(env_file)
+        )
+    assert large_env_to_dict(env_file, interpolate=False, chunk_size=64) == (
+        dotenv_values(env_file, interpolate=False)
+    )
+
+
+def test_mask_large_env_file_matches_sequential_mask(tmp_path):
+    env_file = make_env(tmp_path)
+    expected = mask_env_bytes(env_file.read_bytes(), ["SECRET"], [], ["URL_50"])
+
+    mask_large_env_file(
+        env_file, ["SECRET"], extra_keys=["URL_50"], chunk_size=50, workers=2
+    )
+
+    assert env_file.read_bytes() == expected
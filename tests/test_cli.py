@@ -1,7 +1,9 @@
 import json
+import os
 
 from click.testing import CliRunner
 
+from env_wrangler.application import secrets as secrets_app
 from env_wrangler.cli import cli
 
 
@@ -141,6 +143,27 @@ def test_extract_default_format_saves_both_files(tmp_path, monkeypatch):
     assert (tmp_path / ".secrets").exists()
 
 
+def test_extract_uses_project_config(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET", "PASSWORD"],
+                "ignore_keys": ["IGNORED_KEY"],
+                "envs": [".env", ".django"],
+            }
+        },
+    )
+    runner = CliRunner()
+    (tmp_path / ".env-wrangler.toml").write_text('[default]\nkey_words = ["TOKEN"]\n')
+    write_env_file(tmp_path / ".env", {"SECRET_KEY": "secret", "API_TOKEN": "token"})
+
+    result = runner.invoke(cli, ["extract", "--path", str(tmp_path), "--format", "env"])
+
+    assert result.exit_code == 0
+    assert read_env_file(tmp_path / ".secrets") == {"API_TOKEN": "token"}
+
+
 def test_mask_path_is_file(tmp_path, monkeypatch):
     monkeypatch.setattr(
         "env_wrangler.cli.config",
@@ -218,6 +241,70 @@ def test_mask_masks_matching_keys_and_respects_ignore_keys(tmp_path, monkeypatch
     }
 
 
+def test_extract_mask_unmask_derived_secrets(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET", "PASSWORD"],
+                "ignore_keys": [],
+                "envs": [".env", ".postgres"],
+            }
+        },
+    )
+    runner = CliRunner()
+    write_env_file(tmp_path / ".postgres", {"POSTGRES_PASSWORD": "hunter2"})
+    write_env_file(
+        tmp_path / ".env",
+        {"DATABASE_URL": "postgres://user:hunter2@db/app", "FOO": "bar"},
+    )
+
+    runner.invoke(cli, ["extract", "--path", str(tmp_path), "--format", "env"])
+    assert read_env_file(tmp_path / ".secrets") == {
+        "DATABASE_URL": "postgres://user:hunter2@db/app",
+        "POSTGRES_PASSWORD": "hunter2",
+    }
+
+    runner.invoke(cli, ["mask", "--path", str(tmp_path)])
+    assert read_env_file(tmp_path / ".env") == {
+        "DATABASE_URL": "********",
+        "FOO": "bar",
+    }
+
+    runner.invoke(cli, ["unmask", "--path", str(tmp_path)])
+    assert read_env_file(tmp_path / ".env") == {
+        "DATABASE_URL": "postgres://user:hunter2@db/app",
+        "FOO": "bar",
+    }
+
+
+def test_extract_mask_unmask_keeps_interpolation(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["PASSWORD"],
+                "ignore_keys": [],
+                "envs": [".env"],
+            }
+        },
+    )
+    runner = CliRunner()
+    original = (
+        "POSTGRES_USER=postgres\n"
+        "POSTGRES_PASSWORD=hunter22\n"
+        "DATABASE_URL=postgres://${POSTGRES_USER}:${POSTGRES_PASSWORD}@db/app\n"
+    )
+    (tmp_path / ".env").write_text(original)
+
+    for command in ("extract", "mask"):
+        runner.invoke(cli, [command, "--path", str(tmp_path)])
+    assert read_env_file(tmp_path / ".env")["DATABASE_URL"] == "********"
+
+    runner.invoke(cli, ["unmask", "--path", str(tmp_path)])
+    assert (tmp_path / ".env").read_text() == original
+
+
 def test_unmask_path_is_file(tmp_path, monkeypatch):
     monkeypatch.setattr(
         "env_wrangler.cli.config",
@@ -342,3 +429,365 @@ def test_unmask_help_does_not_show_verbose_option():
 
     assert result.exit_code == 0
     assert "--verbose" not in result.output
+
+
+def test_scan_leaks_reports_file_and_line(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET", "PASSWORD"],
+                "ignore_keys": [],
+                "envs": [".env"],
+            }
+        },
+    )
+    runner = CliRunner()
+    envs = tmp_path / ".envs"
+    envs.mkdir()
+    write_env_file(envs / ".env", {"SECRET_KEY": "hunter22", "FOO": "bar"})
+    write_env_file(envs / ".secrets", {"SECRET_KEY": "hunter22"})
+    (tmp_path / "settings.py").write_text("DEBUG = True\nKEY = 'hunter22'\n")
+    (tmp_path / ".gitignore").write_text("*.log\n")
+    (tmp_path / "debug.log").write_text("hunter22\n")
+    (tmp_path / "blob.bin").write_bytes(b"\0hunter22")
+
+    result = runner.invoke(
+        cli,
+        [
+            "scan-leaks",
+            "--path",
+            str(envs),
+            "--root",
+            str(tmp_path),
+            "--workers",
+            "1",
+        ],
+    )
+
+    assert result.exit_code == 1
+    assert f"{tmp_path / 'settings.py'}:2: SECRET_KEY" in result.output
+    assert "debug.log" not in result.output
+    assert "blob.bin" not in result.output
+    assert ".secrets" not in result.output
+
+
+def test_scan_leaks_no_leaks(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET", "PASSWORD"],
+                "ignore_keys": [],
+                "envs": [".env"],
+            }
+        },
+    )
+    runner = CliRunner()
+    (tmp_path / "secrets.json").write_text(json.dumps({"SECRET_KEY": "hunter22"}))
+    (tmp_path / "settings.py").write_text("DEBUG = True\n")
+
+    result = runner.invoke(
+        cli, ["scan-leaks", "--path", str(tmp_path), "--root", str(tmp_path)]
+    )
+
+    assert result.exit_code == 0
+    assert "No leaked secrets found." in result.output
+
+
+def test_mask_then_restore_latest_snapshot(tmp_path, monkeypatch, snapshot_store):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET", "PASSWORD"],
+                "ignore_keys": [],
+                "envs": [".env", ".django"],
+            }
+        },
+    )
+    runner = CliRunner()
+    write_env_file(tmp_path / ".secrets", {"SECRET_KEY": "secret"})
+    write_env_file(tmp_path / ".env", {"SECRET_KEY": "secret", "FOO": "bar"})
+    original = (tmp_path / ".env").read_text()
+
+    runner.invoke(cli, ["mask", "--path", str(tmp_path)])
+    runner.invoke(cli, ["mask", "--path", str(tmp_path)])
+    assert read_env_file(tmp_path / ".env")["SECRET_KEY"] == "********"  # noqa: S105
+
+    result = runner.invoke(cli, ["restore", "--path", str(tmp_path), "--list"])
+    assert result.exit_code == 0
+    assert len(result.output.splitlines()) == 2  # noqa: PLR2004
+
+    result = runner.invoke(cli, ["restore", "--path", str(tmp_path)])
+
+    assert result.exit_code == 0
+    assert "Restored the following envs:" in result.output
+    assert (tmp_path / ".env").read_text() == original
+    blobs = [file for file in (snapshot_store / "objects").rglob("*") if file.is_file()]
+    assert len(blobs) == 2  # noqa: PLR2004
+
+
+def test_restore_gc_removes_unreferenced_blobs(tmp_path, snapshot_store, monkeypatch):
+    monkeypatch.setattr("env_wrangler.infrastructure.snapshots.BLOB_GRACE_SECONDS", -1)
+    orphan = snapshot_store / "objects" / "ab" / "cdef"
+    orphan.parent.mkdir(parents=True)
+    orphan.write_bytes(b"stale")
+
+    result = CliRunner().invoke(cli, ["restore", "--path", str(tmp_path), "--gc"])
+
+    assert result.exit_code == 0
+    assert "Removed 0 snapshot(s) and 1 stored file(s)." in result.output
+    assert not orphan.exists()
+
+
+def test_restore_without_snapshots(tmp_path):
+    runner = CliRunner()
+
+    result = runner.invoke(cli, ["restore", "--path", str(tmp_path)])
+
+    assert result.exit_code == 0
+    assert "No snapshot found" in result.output
+
+
+def test_drift_reports_missing_and_reused_secrets(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET", "PASSWORD"],
+                "ignore_keys": ["IGNORED_SECRET"],
+                "envs": [".django", ".postgres"],
+            }
+        },
+    )
+    runner = CliRunner()
+    production = tmp_path / ".production"
+    staging = tmp_path / ".staging"
+    local = tmp_path / ".local"
+    for path in (production, staging, local):
+        path.mkdir()
+    write_env_file(production / ".django", {"SECRET_KEY": "p-value", "FOO": "bar"})
+    write_env_file(production / ".postgres", {"POSTGRES_PASSWORD": "shared"})
+    write_env_file(staging / ".django", {"SECRET_KEY": "stage"})
+    write_env_file(staging / ".postgres", {"POSTGRES_PASSWORD": "shared"})
+    write_env_file(local / ".django", {"SECRET_KEY": "********", "IGNORED_SECRET": "x"})
+
+    args = ["drift", "-p", str(production), "-p", str(staging), "-p", str(local)]
+    result = runner.invoke(cli, [*args, "--format", "json"])
+
+    assert result.exit_code == 0
+    rows = json.loads(result.output)
+    assert rows == [
+        {
+            "key": "POSTGRES_PASSWORD",
+            "missing": [str(local)],
+            "reused": [[str(production), str(staging)]],
+            "values": {str(production): "A", str(staging): "A", str(local): None},
+        },
+        {
+            "key": "SECRET_KEY",
+            "missing": [],
+            "reused": [],
+            "values": {str(production): "A", str(staging): "B", str(local): "masked"},
+        },
+    ]
+    assert "shared" not in result.output
+    assert "p-value" not in result.output
+
+    result = runner.invoke(cli, args)
+
+    assert result.exit_code == 0
+    lines = result.output.splitlines()
+    assert lines[0].startswith("KEY")
+    assert lines[1].split() == [
+        "POSTGRES_PASSWORD",
+        "A",
+        "A",
+        "-",
+        "missing,",
+        "reused",
+    ]
+
+    result = runner.invoke(cli, [*args, "--format", "jsonl"])
+
+    assert [json.loads(line)["key"] for line in result.output.splitlines()] == [
+        "POSTGRES_PASSWORD",
+        "SECRET_KEY",
+    ]
+
+
+def test_bulk_unmask_isolates_failures_and_resumes(tmp_path, monkeypatch, journal_dir):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET"],
+                "ignore_keys": [],
+                "envs": [".env"],
+            }
+        },
+    )
+    runner = CliRunner()
+    good = tmp_path / "good"
+    bad = tmp_path / "bad"
+    for path in (good, bad):
+        path.mkdir()
+        write_env_file(path / ".env", {"SECRET_KEY": "********"})
+    (good / "secrets.json").write_text(json.dumps({"SECRET_KEY": "good"}))
+    (bad / "secrets.json").write_text("{not json")
+    args = ["unmask", "-p", str(good), "-p", str(bad)]
+
+    result = runner.invoke(cli, args)
+
+    assert result.exit_code == 1
+    assert f"Failed to unmask {bad}" in result.output
+    assert read_env_file(good / ".env") == {"SECRET_KEY": "good"}
+    assert len(list(journal_dir.iterdir())) == 1
+
+    (bad / "secrets.json").write_text(json.dumps({"SECRET_KEY": "fixed"}))
+    write_env_file(good / ".env", {"SECRET_KEY": "********"})
+
+    result = runner.invoke(cli, [*args, "--resume"])
+
+    assert result.exit_code == 0
+    assert f"Skipping {good} (already done)" in result.output
+    assert read_env_file(good / ".env") == {"SECRET_KEY": "********"}
+    assert read_env_file(bad / ".env") == {"SECRET_KEY": "fixed"}
+    assert list(journal_dir.iterdir()) == []
+
+
+def test_bulk_resume_revisits_directories_left_unprocessed(
+    tmp_path, monkeypatch, journal_dir
+):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET"],
+                "ignore_keys": [],
+                "envs": [".env"],
+            }
+        },
+    )
+    runner = CliRunner()
+    empty = tmp_path / "empty"
+    bad = tmp_path / "bad"
+    for path in (empty, bad):
+        path.mkdir()
+        write_env_file(path / ".env", {"SECRET_KEY": "********"})
+    (bad / "secrets.json").write_text("{not json")
+    args = ["unmask", "-p", str(empty), "-p", str(bad)]
+
+    result = runner.invoke(cli, args)
+
+    assert result.exit_code == 1
+    assert "No secrets file(s) found" in result.output
+
+    (empty / "secrets.json").write_text(json.dumps({"SECRET_KEY": "found"}))
+    result = runner.invoke(cli, [*args, "--resume"])
+
+    assert f"Skipping {empty} (already done)" not in result.output
+    assert read_env_file(empty / ".env") == {"SECRET_KEY": "found"}
+
+
+def test_unmask_uses_compact_store(tmp_path, monkeypatch, mocker):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET"],
+                "ignore_keys": [],
+                "envs": [".env"],
+            }
+        },
+    )
+    runner = CliRunner()
+    write_env_file(tmp_path / ".env", {"API_SECRET": "s3cr3t", "FOO": "bar"})
+
+    result = runner.invoke(cli, ["extract", "--path", str(tmp_path), "--compact"])
+    assert result.exit_code == 0
+    assert "Secrets saved to" in result.output
+    assert (tmp_path / ".secrets.bin").exists()
+
+    runner.invoke(cli, ["mask", "--path", str(tmp_path)])
+    (tmp_path / ".secrets").unlink()
+    (tmp_path / "secrets.json").unlink()
+    envs_to_dict = mocker.spy(secrets_app, "envs_to_dict")
+
+    result = runner.invoke(cli, ["unmask", "--path", str(tmp_path)])
+    assert result.exit_code == 0
+    assert read_env_file(tmp_path / ".env") == {"API_SECRET": "s3cr3t", "FOO": "bar"}
+    envs_to_dict.assert_not_called()
+
+
+def test_unmask_ignores_stale_compact_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET"],
+                "ignore_keys": [],
+                "envs": [".env"],
+            }
+        },
+    )
+    runner = CliRunner()
+    write_env_file(tmp_path / ".env", {"API_SECRET": "old"})
+    runner.invoke(cli, ["extract", "--path", str(tmp_path), "--compact"])
+    runner.invoke(cli, ["mask", "--path", str(tmp_path)])
+
+    compact = tmp_path / ".secrets.bin"
+    stale = compact.stat().st_mtime_ns - 1_000_000_000
+    os.utime(compact, ns=(stale, stale))
+    write_env_file(tmp_path / ".secrets", {"API_SECRET": "new"})
+
+    runner.invoke(cli, ["unmask", "--path", str(tmp_path)])
+    assert read_env_file(tmp_path / ".env") == {"API_SECRET": "new"}
+
+
+def test_compact_store_is_built_from_the_store_just_written(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        "env_wrangler.cli.config",
+        {
+            "default": {
+                "key_words": ["SECRET"],
+                "ignore_keys": [],
+                "envs": [".env"],
+            }
+        },
+    )
+    runner = CliRunner()
+    write_env_file(tmp_path / ".env", {"API_SECRET": "old"})
+    runner.invoke(cli, ["extract", "--path", str(tmp_path), "--format", "env"])
+
+    write_env_file(tmp_path / ".env", {"API_SECRET": "new", "DB_SECRET": "db"})
+    args = ["extract", "--path", str(tmp_path), "--format", "json", "--compact"]
+    runner.invoke(cli, args)
+    runner.invoke(cli, ["mask", "--path", str(tmp_path)])
+    runner.invoke(cli, ["unmask", "--path", str(tmp_path)])
+
+    assert read_env_file(tmp_path / ".env") == {"API_SECRET": "new", "DB_SECRET": "db"}
+
+
+def test_drift_merges_spilled_fingerprints(tmp_path, mocker):
+    defaults = {"key_words": ["SECRET"], "ignore_keys": [], "envs": [".env"]}
+    paths = []
+    for name, values in (
+        ("a", {"A_SECRET": "same", "B_SECRET": "x"}),
+        ("b", {"A_SECRET": "same"}),
+    ):
+        path = tmp_path / name
+        path.mkdir()
+        write_env_file(path / ".env", values)
+        paths.append(path)
+    read_run = mocker.spy(secrets_app, "read_run")
+
+    rows = list(secrets_app.secret_drift(paths, defaults))
+
+    assert read_run.call_count == len(paths)
+    assert [(row["key"], row["missing"]) for row in rows] == [
+        ("A_SECRET", []),
+        ("B_SECRET", [str(paths[1])]),
+    ]
+    assert rows[0]["reused"] == [[str(path) for path in paths]]
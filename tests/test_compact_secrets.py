@@ -0,0 +1,86 @@
+import json
+import os
+
+import pytest
+
+from env_wrangler.application.secrets import unmask_secrets
+from env_wrangler.infrastructure.compact_secrets import CompactSecrets
+from env_wrangler.infrastructure.compact_secrets import CompactSecretsError
+from env_wrangler.infrastructure.compact_secrets import write_compact_secrets
+
+
+def test_compact_secrets_round_trip(tmp_path):
+    items = [("API_KEY", "abc=1"), ("EMPTY", ""), ("NONE", None), ("ÜBER", "ß")]
+    file = write_compact_secrets(tmp_path / ".secrets.bin", items)
+
+    with CompactSecrets(file) as store:
+        assert len(store) == len(items)
+        assert list(store) == [key for key, _ in items]
+        assert store["API_KEY"] == "abc=1"
+        assert store["EMPTY"] == ""
+        assert store["NONE"] is None
+        assert store["ÜBER"] == "ß"
+        assert "MISSING" not in store
+        assert store.get("MISSING") is None
+
+
+def test_compact_secrets_empty_store(tmp_path):
+    file = write_compact_secrets(tmp_path / ".secrets.bin", [])
+
+    with CompactSecrets(file) as store:
+        assert dict(store) == {}
+
+
+def test_compact_secrets_rejects_corruption(tmp_path):
+    file = write_compact_secrets(tmp_path / ".secrets.bin", [("KEY", "value")])
+    data = bytearray(file.read_bytes())
+    data[-1] ^= 0xFF
+    file.write_bytes(bytes(data))
+
+    with pytest.raises(CompactSecretsError):
+        CompactSecrets(file, verify=True)
+
+    (tmp_path / "other").write_bytes(b"KEY=value\n")
+    with pytest.raises(CompactSecretsError):
+        CompactSecrets(tmp_path / "other")
+
+
+def test_unmask_decodes_only_encountered_keys(tmp_path, mocker):
+    items = sorted(
+        (f"KEY_{index:05}_SECRET", f"value-{index}") for index in range(2000)
+    )
+    write_compact_secrets(tmp_path / ".secrets.bin", items)
+    (tmp_path / ".env").write_text("KEY_00042_SECRET=********\nFOO=bar\n")
+    key_bytes = mocker.spy(CompactSecrets, "_key_bytes")
+    checksum = mocker.spy(CompactSecrets, "_checksum_matches")
+
+    unmask_secrets(tmp_path, ["SECRET"], [".env"])
+
+    assert (tmp_path / ".env").read_text() == "KEY_00042_SECRET=value-42\nFOO=bar\n"
+    assert key_bytes.call_count < 50  # noqa: PLR2004
+    assert checksum.call_count == 1
+
+
+def test_write_compact_secrets_requires_sorted_unique_keys(tmp_path):
+    with pytest.raises(ValueError, match="sorted"):
+        write_compact_secrets(tmp_path / ".secrets.bin", [("B", "1"), ("A", "2")])
+    with pytest.raises(ValueError, match="sorted"):
+        write_compact_secrets(tmp_path / ".secrets.bin", [("A", "1"), ("A", "2")])
+    assert not (tmp_path / ".secrets.bin").exists()
+
+
+@pytest.mark.parametrize("corrupt", [b"L", b"\xff"])
+def test_unmask_falls_back_when_a_value_byte_is_corrupted(tmp_path, corrupt):
+    store = write_compact_secrets(
+        tmp_path / ".secrets.bin", [("API_SECRET", "topsecretvalue")]
+    )
+    data = bytearray(store.read_bytes())
+    data[data.rindex(b"l")] = corrupt[0]
+    store.write_bytes(bytes(data))
+    (tmp_path / "secrets.json").write_text(json.dumps({"API_SECRET": "from-json"}))
+    os.utime(tmp_path / "secrets.json", ns=(0, 0))
+    (tmp_path / ".env").write_text("API_SECRET=********\n")
+
+    unmask_secrets(tmp_path, ["SECRET"], [".env"])
+
+    assert (tmp_path / ".env").read_text() == "API_SECRET=from-json\n"
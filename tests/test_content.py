@@ -0,0 +1,69 @@
+import pytest
+
+from env_wrangler import classify_secrets
+from env_wrangler import extract_secrets_from_content
+from env_wrangler import mask_content
+from env_wrangler import parse_env
+from env_wrangler import unmask_content
+from env_wrangler.infrastructure.content import to_bytes
+
+
+def test_parse_env_accepts_str_bytes_and_lines():
+    expected = {"FOO": "bar", "URL": "x://bar"}
+
+    assert parse_env("FOO=bar\nURL=x://${FOO}\n") == expected
+    assert parse_env(b"FOO=bar\nURL=x://${FOO}\n") == expected
+    assert parse_env(["FOO=bar", "URL=x://${FOO}"]) == expected
+    assert parse_env(["FOO=bar", "URL=x://${FOO}"], interpolate=False) == {
+        "FOO": "bar",
+        "URL": "x://${FOO}",
+    }
+
+
+def test_extract_secrets_from_content_merges_contents_and_mappings():
+    result = extract_secrets_from_content(
+        [
+            {"POSTGRES_PASSWORD": "hunter22", "ALREADY_PASSWORD": "********"},
+            "DATABASE_URL=postgres://u:hunter22@db/app\nFOO=bar\n",
+        ],
+        ["PASSWORD"],
+    )
+
+    assert result == {
+        "DATABASE_URL": "postgres://u:hunter22@db/app",
+        "POSTGRES_PASSWORD": "hunter22",
+    }
+
+
+def test_mask_and_unmask_content_round_trip():
+    content = "export SECRET_KEY='s3cr3t!'  # comment\nFOO=bar\n"
+
+    masked = mask_content(content, ["SECRET"])
+
+    assert masked == "export SECRET_KEY='********'  # comment\nFOO=bar\n"
+    assert unmask_content(masked, {"SECRET_KEY": "s3cr3t!"}) == content
+
+
+def test_mask_content_returns_bytes_for_bytes():
+    assert mask_content([b"SECRET=1", b"FOO=2"], ["SECRET"]) == (
+        b"SECRET=********\nFOO=2\n"
+    )
+    assert mask_content(b"FOO=2", ["SECRET"]) == b"FOO=2"
+
+
+def test_content_api_accepts_mappings():
+    env = {"A_SECRET": "hunter22", "URL": "x://hunter22@db", "FOO": None}
+
+    assert parse_env(env) == env
+    masked = mask_content(env, ["SECRET"])
+    assert masked == {"A_SECRET": "********", "URL": "********", "FOO": None}
+    secrets = {"A_SECRET": "hunter22", "URL": "x://hunter22@db"}
+    assert unmask_content(masked, secrets) == env
+    with pytest.raises(TypeError):
+        to_bytes(env)
+
+
+def test_classify_secrets_is_public():
+    env = {"A_SECRET": "hunter22", "URL": "x://${A_SECRET}"}
+
+    assert classify_secrets(env, env, ["SECRET"]) == env
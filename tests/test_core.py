@@ -1,16 +1,26 @@
 import json
+import shutil
+import subprocess
 from pathlib import Path
 
+import pytest
 from dotenv import dotenv_values
 
+from env_wrangler.domain.interpolation import keys_depending_on
+from env_wrangler.domain.matching import compile_secret_pattern
 from env_wrangler.domain.secrets import filter_keys_by_substring
+from env_wrangler.domain.secrets import find_derived_secrets
 from env_wrangler.domain.secrets import remove_masked_values
+from env_wrangler.infrastructure.env_index import index_env_bytes
+from env_wrangler.infrastructure.env_index import patch_env_bytes
 from env_wrangler.infrastructure.files import envs_to_dict
 from env_wrangler.infrastructure.files import json_to_env
 from env_wrangler.infrastructure.files import mask_sensitive_data_in_file
 from env_wrangler.infrastructure.files import save_dict_to_env_file
 from env_wrangler.infrastructure.files import save_dict_to_json_file
 from env_wrangler.infrastructure.files import unmask_sensitive_data_in_file
+from env_wrangler.infrastructure.scan import iter_repo_files
+from env_wrangler.infrastructure.scan import scan_file
 
 
 def test_envs_to_dict(tmp_path):
@@ -113,6 +123,65 @@ def test_remove_masked_values():
     assert remove_masked_values(input_dict) == expected_dict
 
 
+def test_compile_secret_pattern():
+    pattern = compile_secret_pattern(["hunter2", "hunter22", "s3cr3t", ""])
+
+    found = [match.group() for match in pattern.finditer("a:hunter22@s3cr3t")]
+
+    assert found == ["hunter22", "s3cr3t"]
+    assert compile_secret_pattern(["abc"], min_length=4) is None
+
+
+def test_keys_depending_on():
+    raw_env = {
+        "SECRET_KEY": "secret",
+        "URL": "https://${HOST}/${SECRET_KEY}",
+        "HOST": "example.com",
+        "NESTED": "${URL:-fallback}",
+        "LOOP_A": "${LOOP_B}",
+        "LOOP_B": "${LOOP_A}",
+    }
+
+    assert keys_depending_on(raw_env, {"SECRET_KEY"}) == {"URL", "NESTED"}
+
+
+def test_find_derived_secrets():
+    env = {
+        "POSTGRES_PASSWORD": "hunter2",
+        "DATABASE_URL": "postgres://user:hunter2@db/app",
+        "REDIS_URL": "redis://${REDIS_PASSWORD}@redis",
+        "REDIS_PASSWORD": "********",
+        "SHORT_SECRET": "abc",
+        "FOO": "abc",
+        "IGNORED": "hunter2",
+    }
+    raw_env = dict(env)
+    secrets = filter_keys_by_substring(env, ["PASSWORD", "SECRET"])
+
+    result = find_derived_secrets(env, raw_env, secrets, ["IGNORED"])
+
+    assert result == {
+        "DATABASE_URL": "postgres://user:hunter2@db/app",
+        "REDIS_URL": "redis://${REDIS_PASSWORD}@redis",
+    }
+
+
+def test_find_derived_secrets_requires_token_boundaries():
+    env = {
+        "POSTGRES_USER": "postgres",
+        "POSTGRES_PASSWORD": "hunter22",
+        "POSTGRES_HOST": "postgres",
+        "ENGINE": "django.db.backends.postgresql",
+        "GREETING": "xhunter22x",
+        "QUERY_URL": "https://db/?user=app&password=hunter22",
+    }
+    secrets = filter_keys_by_substring(env, ["USER", "PASSWORD"])
+
+    result = find_derived_secrets(env, env, secrets)
+
+    assert result == {"QUERY_URL": "https://db/?user=app&password=hunter22"}
+
+
 def test_mask_sensitive_data_in_file(tmp_path):
     # Create a .env file in the temporary directory
     env_file = tmp_path / ".env"
@@ -121,13 +190,13 @@ def test_mask_sensitive_data_in_file(tmp_path):
     )
 
     # Call mask_sensitive_data with the path to the .env file and a list of sensitive keys
-    output_file = mask_sensitive_data_in_file(
+    masked_keys = mask_sensitive_data_in_file(
         str(env_file), ["KEY", "PASSWORD"], ["IGNORED_KEY"]
     )
 
     # Load the .env file and check that the sensitive keys have been masked
     env_vars = dotenv_values(str(env_file))
-    assert isinstance(output_file, Path)
+    assert masked_keys == ["SECRET_KEY", "PASSWORD"]
     assert env_vars["SECRET_KEY"] == "********"  # noqa: S105
     assert env_vars["PASSWORD"] == "********"  # noqa: S105
     assert env_vars["FOO"] == "bar"
@@ -135,25 +204,139 @@ def test_mask_sensitive_data_in_file(tmp_path):
     assert env_vars["IGNORED_KEY"] == "ignored"
 
 
+def test_mask_sensitive_data_in_file_extra_keys(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("DATABASE_URL=postgres://u:p@db/app\nFOO=bar")
+
+    mask_sensitive_data_in_file(env_file, ["KEY"], extra_keys=["DATABASE_URL"])
+
+    env_vars = dotenv_values(str(env_file))
+    assert env_vars["DATABASE_URL"] == "********"
+    assert env_vars["FOO"] == "bar"
+
+
 def test_unmask_sensitive_data_in_file(tmp_path):
     # Create a .env file in the temporary directory with masked sensitive data
     env_file = tmp_path / ".env"
-    env_file.write_text("SECRET_KEY=secret\nPASSWORD=password\nFOO=bar\nBAR=baz")
+    env_file.write_text("SECRET_KEY=********\nPASSWORD=********\nFOO=bar\nBAR=baz")
 
     # Call unmask_sensitive_data_in_file with the path to the .env file, a list of sensitive keys, and their original values
-    output_file = unmask_sensitive_data_in_file(
+    restored_keys = unmask_sensitive_data_in_file(
         str(env_file), {"SECRET_KEY": "secret", "PASSWORD": "password"}
     )
 
     # Load the .env file and check that the sensitive keys have been unmasked
     env_vars = dotenv_values(str(env_file))
-    assert isinstance(output_file, Path)
+    assert restored_keys == ["SECRET_KEY", "PASSWORD"]
     assert env_vars["SECRET_KEY"] == "secret"  # noqa: S105
     assert env_vars["PASSWORD"] == "password"  # noqa: S105
     assert env_vars["FOO"] == "bar"
     assert env_vars["BAR"] == "baz"
 
 
+def test_index_env_bytes():
+    data = (
+        b"# comment\n"
+        b"export SECRET_KEY='secret' # inline\n"
+        b'PASSWORD = "pa\\"ss"\n'
+        b'MULTI="line1\nline2"\n'
+        b"FOO=bar baz # comment\r\n"
+        b"EMPTY=\n"
+    )
+
+    entries = index_env_bytes(data)
+
+    assert [(entry.key, entry.value(data), entry.quote) for entry in entries] == [
+        ("SECRET_KEY", b"secret", b"'"),
+        ("PASSWORD", b'pa\\"ss', b'"'),
+        ("MULTI", b"line1\nline2", b'"'),
+        ("FOO", b"bar baz", b""),
+        ("EMPTY", b"", b""),
+    ]
+
+
+def test_patch_env_bytes_returns_none_when_unchanged():
+    data = b"FOO=bar\n"
+    (entry,) = index_env_bytes(data)
+
+    assert patch_env_bytes(data, [(entry, b"bar")]) is None
+    assert patch_env_bytes(data, [(entry, b"baz")]) == b"FOO=baz\n"
+
+
+def test_mask_unmask_round_trip_preserves_format(tmp_path):
+    original = (
+        "# Settings\n"
+        "export SECRET_KEY='secret'  # keep me\n"
+        'PASSWORD="pa ss\\"word"\n'
+        "FOO=bar\n"
+    )
+    env_file = tmp_path / ".env"
+    env_file.write_text(original)
+
+    mask_sensitive_data_in_file(env_file, ["KEY", "PASSWORD"])
+
+    assert env_file.read_text() == (
+        "# Settings\n"
+        "export SECRET_KEY='********'  # keep me\n"
+        'PASSWORD="********"\n'
+        "FOO=bar\n"
+    )
+
+    unmask_sensitive_data_in_file(
+        env_file, {"SECRET_KEY": "secret", "PASSWORD": 'pa ss"word'}
+    )
+
+    assert env_file.read_text() == original
+
+
+def test_mask_unmask_round_trip_escaped_values(tmp_path):
+    original = (
+        "A_SECRET='it\\'s'\n"
+        'B_SECRET="line\\nbreak\\t\\"q\\" \\\\"\n'
+        "C_SECRET='C:\\path\\to\\\\'\n"
+        'D_SECRET="C:\\path"\n'
+    )
+    env_file = tmp_path / ".env"
+    env_file.write_text(original)
+    secrets = dotenv_values(env_file)
+
+    mask_sensitive_data_in_file(env_file, ["SECRET"])
+    unmask_sensitive_data_in_file(env_file, secrets)
+
+    assert env_file.read_text() == original
+    assert dotenv_values(env_file) == secrets
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        "-----BEGIN KEY-----\nabc\n-----END KEY-----",
+        "a #b",
+        "  padded  ",
+        "'quoted",
+        '"quoted',
+        "plain#value",
+    ],
+)
+def test_unmask_quotes_unquoted_values_when_needed(tmp_path, value):
+    env_file = tmp_path / ".env"
+    env_file.write_text("PRIVATE_KEY=********\nFOO=bar\n")
+
+    unmask_sensitive_data_in_file(env_file, {"PRIVATE_KEY": value})
+
+    assert dotenv_values(env_file) == {"PRIVATE_KEY": value, "FOO": "bar"}
+
+
+def test_mask_skips_rewrite_when_unchanged(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("SECRET_KEY=********\nFOO=bar\n")
+    mtime = env_file.stat().st_mtime_ns
+
+    mask_sensitive_data_in_file(env_file, ["KEY"])
+
+    assert env_file.stat().st_mtime_ns == mtime
+
+
 def test_json_to_env(tmp_path):
     # Create a JSON file in the temporary directory
     json_file = tmp_path / "data.json"
@@ -172,3 +355,40 @@ def test_json_to_env(tmp_path):
 
     assert isinstance(output_file, Path)
     assert env_data == data
+
+
+def test_compile_secret_pattern_as_bytes(tmp_path):
+    pattern = compile_secret_pattern(["hunter2", "pässword"], as_bytes=True)
+    file = tmp_path / "settings.py"
+    file.write_text("a = 1\nb = 'hunter2'\n\nc = 'pässword'\n")
+
+    assert scan_file(file, pattern) == [(2, b"hunter2"), (4, "pässword".encode())]
+
+
+@pytest.mark.skipif(not shutil.which("git"), reason="git is not installed")
+def test_iter_repo_files_honours_gitignore(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)  # noqa: S603, S607
+    (tmp_path / ".gitignore").write_text("build/\n*.log\n")
+    (tmp_path / "build").mkdir()
+    (tmp_path / "build" / "out.py").write_text("x")
+    (tmp_path / "app.log").write_text("x")
+    (tmp_path / "app.py").write_text("x")
+
+    files = {file.name for file in iter_repo_files(tmp_path)}
+
+    assert files == {".gitignore", "app.py"}
+
+
+def test_iter_repo_files_in_subdirectory_uses_repo_ignores(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)  # noqa: S603, S607
+    (tmp_path / ".gitignore").write_text("node_modules/\n*.log\n!keep.log\n")
+    app = tmp_path / "app"
+    (app / "node_modules").mkdir(parents=True)
+    (app / "node_modules" / "dep.js").write_text("x")
+    (app / "debug.log").write_text("x")
+    (app / "keep.log").write_text("x")
+    (app / "main.py").write_text("x")
+
+    files = set(iter_repo_files(app))
+
+    assert files == {app / "keep.log", app / "main.py"}
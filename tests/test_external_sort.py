@@ -0,0 +1,71 @@
+import json
+from pathlib import Path
+
+from env_wrangler.infrastructure import external_sort
+from env_wrangler.infrastructure.external_sort import iter_json_items
+from env_wrangler.infrastructure.external_sort import merge_sorted
+from env_wrangler.infrastructure.files import save_dict_to_env_file
+from env_wrangler.infrastructure.files import save_dict_to_json_file
+
+
+def test_merge_sorted_spills_and_keeps_last_value():
+    first = [("b", "1"), ("a", "1"), ("c", "1"), ("a", "2")]
+    second = [("c", "2"), ("d", "2")]
+
+    merged = list(merge_sorted([first, second], memory_budget=1))
+
+    assert merged == [("a", "2"), ("b", "1"), ("c", "2"), ("d", "2")]
+
+
+def test_iter_json_items_streams_across_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(external_sort, "READ_SIZE", 3)
+    data = {"nested": {"a": [1, 2.5, None]}, "num": 12345, "text": 'q"uote'}
+    file_path = tmp_path / "secrets.json"
+    file_path.write_text(json.dumps(data, indent=2))
+
+    assert dict(iter_json_items(file_path)) == data
+
+
+def test_save_dict_files_match_previous_format(tmp_path, monkeypatch):
+    monkeypatch.setattr(external_sort, "MEMORY_BUDGET", 1)
+    existing = {"B_KEY": "old", "A_KEY": "a=1", "NESTED": {"x": ["y"]}}
+    data = {"B_KEY": "new", "C_KEY": "c"}
+    expected = {**existing, **data}
+
+    json_file = tmp_path / "secrets.json"
+    json_file.write_text(json.dumps(existing))
+    save_dict_to_json_file(data, json_file)
+
+    env_file = tmp_path / ".secrets"
+    env_file.write_text("B_KEY=old\nA_KEY=a=1\n")
+    save_dict_to_env_file(data, env_file)
+
+    assert json_file.read_text() == json.dumps(expected, indent=2, sort_keys=True)
+    assert env_file.read_text() == "A_KEY=a=1\nB_KEY=new\nC_KEY=c"
+
+
+def test_save_dict_to_json_file_without_existing_file(tmp_path):
+    json_file = tmp_path / "secrets.json"
+    save_dict_to_json_file({"KEY": "value"}, json_file)
+
+    assert json_file.read_text() == json.dumps({"KEY": "value"}, indent=2)
+
+
+def test_spill_runs_stay_next_to_target(tmp_path, monkeypatch):
+    monkeypatch.setattr(external_sort, "MEMORY_BUDGET", 1)
+    spills = []
+    spill = external_sort._spill  # noqa: SLF001
+
+    def record_spill(run, directory):
+        spills.append(directory)
+        return spill(run, directory)
+
+    monkeypatch.setattr(external_sort, "_spill", record_spill)
+    env_file = tmp_path / ".secrets"
+    env_file.write_text("A_KEY=a\nB_KEY=b\n")
+
+    save_dict_to_env_file({"C_KEY": "c"}, env_file)
+
+    assert spills
+    assert all(Path(directory).parent == tmp_path for directory in spills)
+    assert sorted(file.name for file in tmp_path.iterdir()) == [".secrets"]
@@ -1,6 +1,8 @@
 import importlib.resources as importlib_resources
+import os
 from pathlib import Path
 
+from env_wrangler.infrastructure.config import ConfigResolver
 from env_wrangler.infrastructure.config import copy_resource_file
 
 
@@ -22,3 +24,43 @@ def test_copy_resource_file(tmp_path):
     assert dest_file.read_text() == "Test content"
 
     test_file_path.unlink()
+
+
+def test_config_resolver_merges_nearest_last(tmp_path):
+    defaults = {"key_words": ["SECRET"], "ignore_keys": [], "envs": [".env"]}
+    project = tmp_path / "project"
+    service = project / "service"
+    service.mkdir(parents=True)
+    (project / ".env-wrangler.toml").write_text(
+        '[default]\nkey_words = ["TOKEN"]\nenvs = [".django"]\n'
+    )
+    (service / ".env-wrangler.toml").write_text('[default]\nenvs = [".postgres"]\n')
+
+    resolver = ConfigResolver()
+
+    assert resolver.resolve(tmp_path, defaults) == defaults
+    assert resolver.resolve(service, defaults) == {
+        "key_words": ["TOKEN"],
+        "ignore_keys": [],
+        "envs": [".postgres"],
+    }
+
+
+def test_config_resolver_caches_until_mtime_changes(tmp_path, mocker):
+    defaults = {"key_words": ["SECRET"]}
+    config_file = tmp_path / ".env-wrangler.toml"
+    config_file.write_text('[default]\nkey_words = ["TOKEN"]\n')
+    resolver = ConfigResolver()
+    load = mocker.spy(resolver, "_load")
+
+    first = resolver.resolve(tmp_path, defaults)
+    second = resolver.resolve(tmp_path, defaults)
+
+    assert first is second
+    assert load.call_count == 1
+
+    config_file.write_text('[default]\nkey_words = ["PASSWORD"]\n')
+    os.utime(config_file, ns=(0, config_file.stat().st_mtime_ns + 1_000_000))
+
+    assert resolver.resolve(tmp_path, defaults) == {"key_words": ["PASSWORD"]}
+    assert load.call_count == 2  # noqa: PLR2004
@@ -0,0 +1,57 @@
+from env_wrangler.infrastructure import snapshots
+from env_wrangler.infrastructure.snapshots import list_snapshots
+from env_wrangler.infrastructure.snapshots import select_snapshot
+from env_wrangler.infrastructure.snapshots import take_snapshot
+
+
+def test_take_snapshot_reads_only_latest_manifest(tmp_path, mocker):
+    env_file = tmp_path / ".env"
+    for value in ("one", "two", "three"):
+        env_file.write_text(f"SECRET={value}\n")
+        take_snapshot(tmp_path, [env_file])
+
+    read_manifest = mocker.spy(snapshots, "_read_manifest")
+    latest = take_snapshot(tmp_path, [env_file])
+
+    assert read_manifest.call_count == 1
+    assert latest == list_snapshots(tmp_path)[-1]["id"]
+
+
+def test_take_snapshot_prunes_manifests_and_blobs(
+    tmp_path, snapshot_store, monkeypatch
+):
+    monkeypatch.setattr(snapshots, "BLOB_GRACE_SECONDS", -1)
+    env_file = tmp_path / ".env"
+    for value in ("one", "two", "three"):
+        env_file.write_text(f"SECRET={value}\n")
+        take_snapshot(tmp_path, [env_file], keep=2)
+
+    kept = list_snapshots(tmp_path)
+    blobs = [file for file in (snapshot_store / "objects").rglob("*") if file.is_file()]
+
+    assert len(kept) == 2  # noqa: PLR2004
+    assert {blob.parent.name + blob.name for blob in blobs} == {
+        item["files"][".env"] for item in kept
+    }
+
+
+def test_select_snapshot_by_id_and_latest_differing(tmp_path):
+    env_file = tmp_path / ".env"
+    env_file.write_text("SECRET=one\n")
+    first = take_snapshot(tmp_path, [env_file])
+    env_file.write_text("SECRET=two\n")
+    take_snapshot(tmp_path, [env_file])
+
+    assert select_snapshot(tmp_path)["id"] == first
+    assert select_snapshot(tmp_path, first)["id"] == first
+
+
+def test_prune_collects_garbage_at_most_once_per_interval(tmp_path, mocker):
+    collect = mocker.spy(snapshots, "collect_garbage")
+    env_file = tmp_path / ".env"
+    for value in ("one", "two", "three", "four"):
+        env_file.write_text(f"SECRET={value}\n")
+        take_snapshot(tmp_path, [env_file], keep=1)
+
+    assert len(list_snapshots(tmp_path)) == 1
+    assert collect.call_count == 1